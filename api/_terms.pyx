@@ -0,0 +1,67 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled product term filter used by api.main.extract_product_terms.
+
+Build in place with ``cythonize -i api/_terms.pyx``. When the extension is
+not built, api.main falls back to the equivalent regular expression.
+"""
+
+
+cdef inline bint _is_word_char(Py_UCS4 ch):
+    # Same character class as the regex \w for str patterns
+    return ch == u'_' or ch.isalnum()
+
+
+cdef inline bint _is_ascii_upper(Py_UCS4 ch):
+    return u'A' <= ch <= u'Z'
+
+
+cpdef list filter_terms(str text, frozenset stop_words):
+    """
+    Return the words of text that look like product terms.
+
+    Walks the string once and keeps words of 3+ characters that contain
+    a digit, are ALL CAPS (A-Z and underscores) or start with a capital
+    letter and have 5+ characters. Words whose lowercase form is in
+    stop_words are dropped.
+    """
+    cdef list terms = []
+    cdef Py_ssize_t n = len(text)
+    cdef Py_ssize_t i = 0
+    cdef Py_ssize_t start, length
+    cdef Py_UCS4 ch
+    cdef bint has_digit, all_caps, has_upper
+    cdef str term
+
+    while i < n:
+        if not _is_word_char(text[i]):
+            i += 1
+            continue
+
+        start = i
+        has_digit = False
+        all_caps = True
+        has_upper = False
+        while i < n:
+            ch = text[i]
+            if not _is_word_char(ch):
+                break
+            if ch.isdecimal():
+                has_digit = True
+            if _is_ascii_upper(ch):
+                has_upper = True
+            elif ch != u'_':
+                all_caps = False
+            i += 1
+
+        length = i - start
+        if length < 3:
+            continue
+        if has_digit or (all_caps and has_upper) or (
+            length >= 5 and _is_ascii_upper(text[start])
+        ):
+            term = text[start:i]
+            if term.lower() not in stop_words:
+                terms.append(term)
+
+    return terms
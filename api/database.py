@@ -2,12 +2,15 @@
 Database connection setup for FastAPI application.
 """
 
+import logging
 import os
 from urllib.parse import quote_plus
+from uuid import uuid4
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 # Load environment variables
 load_dotenv()
@@ -19,35 +22,94 @@ POSTGRES_DB = os.getenv("POSTGRES_DB", "medical_warehouse")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
 
+# Connection pool configuration (per API worker process).
+# Keep DB_POOL_SIZE + DB_MAX_OVERFLOW multiplied by the number of uvicorn
+# workers below PostgreSQL's max_connections (100 by default).
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 30))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# Set when POSTGRES_HOST/POSTGRES_PORT point at PgBouncer in transaction
+# pooling mode. PgBouncer multiplexes clients onto a few backends, so the
+# application-side pool can stay small (e.g. DB_POOL_SIZE=5).
+USE_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger(__name__)
+
 # Create connection string
 encoded_password = quote_plus(POSTGRES_PASSWORD)
 DATABASE_URL = (
-    f"postgresql://{POSTGRES_USER}:{encoded_password}@"
+    f"postgresql+asyncpg://{POSTGRES_USER}:{encoded_password}@"
     f"{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 )
 
-# Create SQLAlchemy engine
-engine = create_engine(
+# Prepared statements cached per connection, so the hot queries are parsed
+# and planned once per connection. A transaction-pooled connection may reach
+# a different backend for every transaction, so PgBouncer disables caching.
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 200))
+
+connect_args = {
+    "statement_cache_size": STATEMENT_CACHE_SIZE,
+    "prepared_statement_cache_size": STATEMENT_CACHE_SIZE,
+}
+if USE_PGBOUNCER:
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+# Create async SQLAlchemy engine (asyncpg driver)
+engine = create_async_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=5,
-    max_overflow=10,
+    connect_args=connect_args,
+    pool_pre_ping=not USE_PGBOUNCER,  # PgBouncer already checks server connections
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=POOL_TIMEOUT,
+    pool_recycle=POOL_RECYCLE,  # Replace connections before PostgreSQL drops them
 )
 
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _log_checkout(dbapi_connection, connection_record, connection_proxy):
+    """Log pool usage when a connection is checked out."""
+    logger.debug("DB connection checked out (in use: %d)", engine.pool.checkedout())
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _log_checkin(dbapi_connection, connection_record):
+    """Log pool usage when a connection is returned to the pool."""
+    # The pool decrements its counter after this event fires
+    logger.debug("DB connection checked in (in use: %d)", engine.pool.checkedout() - 1)
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Base class for declarative models (if needed in future)
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
     Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
+    Yields an async database session and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_session_factory() -> async_sessionmaker:
+    """
+    Dependency function to get the session factory.
+    Endpoints open sessions only around their queries, so pooled
+    connections are returned before the response is built and sent,
+    and independent queries can run concurrently on separate sessions.
+    """
+    return SessionLocal
@@ -5,17 +5,24 @@ This API exposes analytical endpoints that query the data warehouse
 built with dbt to answer business questions.
 """
 
+import asyncio
+import hashlib
+import os
 import re
 from collections import Counter
 from datetime import date, datetime
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from api.database import get_db
+from api.database import get_session_factory
 from api.schemas import (
     TopProductsResponse,
     ProductItem,
@@ -28,6 +35,12 @@ from api.schemas import (
     ErrorResponse,
 )
 
+# Compiled term filter (api/_terms.pyx); the regex below is used if unbuilt
+try:
+    from api._terms import filter_terms
+except ImportError:
+    filter_terms = None
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Medical Data Warehouse API",
@@ -40,13 +53,108 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # orjson encodes large list payloads much faster than the stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 
+# Validate whole result sets at once instead of building models row by row
+_DAILY_ACTIVITY_LIST = TypeAdapter(List[DailyActivity])
+_MESSAGE_RESULT_LIST = TypeAdapter(List[MessageResult])
+_CHANNEL_VISUAL_STATS_LIST = TypeAdapter(List[ChannelVisualStats])
+
+
+# ============================================================================
+# Response Caches
+# ============================================================================
+
+# Report endpoints serve warehouse data that only changes when the pipeline
+# runs, so their responses are cached in-process for a short time. Entries
+# are keyed on the warehouse version their ETag is built from, so a rebuild
+# never pairs the new ETag with a body computed before it.
+CACHE_TTL_SECONDS = int(os.getenv("API_CACHE_TTL", 300))
+
+_top_products_cache = TTLCache(maxsize=32, ttl=CACHE_TTL_SECONDS)
+_top_products_lock = asyncio.Lock()
+
+_visual_content_cache = TTLCache(maxsize=1, ttl=CACHE_TTL_SECONDS)
+_visual_content_lock = asyncio.Lock()
+
+
+async def _cached(cache: TTLCache, lock: asyncio.Lock, key, compute):
+    """
+    Return the cached value for key, computing and storing it on a miss.
+    
+    The lock makes concurrent misses wait for a single computation instead
+    of all hitting the database.
+    """
+    if key in cache:
+        return cache[key]
+    
+    async with lock:
+        if key not in cache:
+            cache[key] = await compute()
+        return cache[key]
+
+
+# Lets browsers, CDNs and reverse proxies reuse report responses as well
+REPORT_CACHE_CONTROL = f"public, max-age={CACHE_TTL_SECONDS}"
+
+
+async def _warehouse_version(session_factory: async_sessionmaker) -> str:
+    """
+    Return a string that changes whenever the marts are rebuilt or written.
+    
+    dbt recreates table models on every run (new OIDs) and the statistics
+    counters move on any insert, update or delete.
+    """
+    async with session_factory() as db:
+        return (await db.execute(WAREHOUSE_VERSION_SQL)).scalar()
+
+
+def _report_etag(request: Request, version: str) -> str:
+    """
+    Build a weak ETag for a report request from the warehouse version.
+    """
+    digest = hashlib.blake2b(
+        f"{request.url.path}?{request.url.query}|{version}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """
+    Check whether the client's If-None-Match already covers etag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    
+    # Weak comparison: W/ prefixes are ignored
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
+# Words that are never treated as product terms (compared case-insensitively)
+STOP_WORDS = [
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'from', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'can', 'this', 'that', 'these', 'those', 'a', 'an', 'as',
+]
+_STOP_WORDS = frozenset(STOP_WORDS)
+
+# Matches only whole words of 3+ characters that are kept as product
+# terms: words with numbers, ALL CAPS words, or capitalized words longer
+# than 4 characters. Stop words are filtered afterwards.
+_TERM_RE = re.compile(r'\b(?=\w{3})(?:\w*\d\w*|[A-Z_]*[A-Z][A-Z_]*|[A-Z]\w{4,})\b')
+
+
 def extract_product_terms(message_text: str) -> List[str]:
     """
     Extract potential product/medical terms from message text.
@@ -55,41 +163,205 @@ def extract_product_terms(message_text: str) -> List[str]:
     - Words in ALL CAPS (often product names)
     - Words with numbers (e.g., "Paracetamol 500mg")
     - Common medical/pharmaceutical patterns
+    
+    The top-products endpoint normally reads pre-aggregated terms from
+    marts.agg_top_terms or does this extraction inside PostgreSQL (see
+    TOP_TERMS_SQL); this function is only used by the Python fallback path.
     """
     if not message_text:
         return []
     
-    # Split into words
-    words = re.findall(r'\b\w+\b', message_text)
-    
-    # Filter for potential product terms
-    terms = []
-    for word in words:
-        # Skip very short words
-        if len(word) < 3:
-            continue
-        
-        # Skip common stop words
-        stop_words = {
-            'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'from', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has',
-            'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
-            'might', 'can', 'this', 'that', 'these', 'those', 'a', 'an', 'as',
-        }
-        if word.lower() in stop_words:
-            continue
-        
-        # Include words that are all caps (often product names)
-        if word.isupper() and len(word) > 2:
-            terms.append(word)
-        # Include words with numbers
-        elif re.search(r'\d', word):
-            terms.append(word)
-        # Include capitalized words (potential product names)
-        elif word[0].isupper() and len(word) > 4:
-            terms.append(word)
+    if filter_terms is not None:
+        return filter_terms(message_text, _STOP_WORDS)
     
-    return terms
+    return [
+        term for term in _TERM_RE.findall(message_text)
+        if term.lower() not in _STOP_WORDS
+    ]
+
+
+def _date_key(day: date) -> int:
+    """
+    Convert a date to the YYYYMMDD integer used as dim_dates.date_key.
+    """
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+# Same rules as extract_product_terms, evaluated by PostgreSQL in a single
+# scan: tokenize, filter, count and collect channels per term, and return
+# only the top `limit` rows. total_terms is the number of distinct terms
+# before the LIMIT is applied. Capitals are tested with the same ASCII
+# classes as _TERM_RE rather than UPPER()/LOWER(), which follow the
+# database locale; which non-ASCII characters \w and \d match still
+# depends on the locale.
+TOP_TERMS_SQL = text(r"""
+    WITH words AS (
+        SELECT
+            fm.channel_key,
+            m.match[1] AS term
+        FROM marts.fct_messages fm
+        CROSS JOIN LATERAL regexp_matches(fm.message_text, '(\w+)', 'g') AS m(match)
+        WHERE fm.message_text IS NOT NULL
+            AND LENGTH(TRIM(fm.message_text)) > 0
+    ),
+    product_terms AS (
+        SELECT channel_key, term
+        FROM words
+        WHERE LENGTH(term) >= 3
+            AND LOWER(term) <> ALL(:stop_words)
+            AND (
+                -- All caps (often product names)
+                term ~ '^[A-Z_]*[A-Z][A-Z_]*$'
+                -- Words with numbers
+                OR term ~ '\d'
+                -- Capitalized words (potential product names)
+                OR (LENGTH(term) > 4 AND term ~ '^[A-Z]')
+            )
+    )
+    SELECT
+        pt.term,
+        COUNT(*) AS frequency,
+        ARRAY_AGG(DISTINCT dc.channel_name) AS channels,
+        COUNT(*) OVER () AS total_terms
+    FROM product_terms pt
+    INNER JOIN marts.dim_channels dc ON pt.channel_key = dc.channel_key
+    GROUP BY pt.term
+    ORDER BY frequency DESC, pt.term
+    LIMIT :limit
+""")
+
+
+# ============================================================================
+# SQL Statements
+# ============================================================================
+# Built once at import time so SQLAlchemy's compiled cache and asyncpg's
+# per-connection prepared statement cache are reused across requests.
+
+TABLE_EXISTS_SQL = text("""
+    SELECT EXISTS (
+        SELECT FROM information_schema.tables 
+        WHERE table_schema = 'marts' 
+        AND table_name = :table_name
+    )
+""")
+
+TOP_TERMS_MART_SQL = text("""
+    SELECT
+        term,
+        frequency,
+        channels,
+        refreshed_at,
+        (SELECT COUNT(*) FROM marts.agg_top_terms) AS total_terms
+    FROM marts.agg_top_terms
+    ORDER BY frequency DESC, term
+    LIMIT :limit
+""")
+
+MESSAGE_TEXTS_SQL = text("""
+    SELECT message_text
+    FROM marts.fct_messages
+    WHERE message_text IS NOT NULL
+        AND LENGTH(TRIM(message_text)) > 0
+""")
+
+# Channels where each of the given terms appears
+TERM_CHANNELS_SQL = text("""
+    SELECT t.term, ARRAY_AGG(DISTINCT dc.channel_name)
+    FROM UNNEST(CAST(:terms AS TEXT[])) AS t(term)
+    INNER JOIN marts.fct_messages fm
+        ON fm.message_text ILIKE '%' || t.term || '%'
+    INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
+    GROUP BY t.term
+""")
+
+CHANNEL_INFO_SQL = text("""
+    SELECT 
+        channel_name,
+        channel_type,
+        total_posts,
+        first_post_date,
+        last_post_date,
+        avg_views
+    FROM marts.dim_channels
+    WHERE channel_name = :channel_name
+""")
+
+# Filters on fct_messages.date_key (YYYYMMDD) so the (channel_key, date_key)
+# index bounds the scan to the requested range
+DAILY_ACTIVITY_SQL = text("""
+    SELECT 
+        dd.full_date as date,
+        COUNT(fm.message_id) as message_count,
+        SUM(fm.view_count) as total_views,
+        COALESCE(AVG(fm.view_count), 0) as avg_views,
+        SUM(fm.forward_count) as total_forwards
+    FROM marts.fct_messages fm
+    INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
+    INNER JOIN marts.dim_dates dd ON fm.date_key = dd.date_key
+    WHERE dc.channel_name = :channel_name
+        AND fm.date_key BETWEEN :start_key AND :end_key
+    GROUP BY dd.full_date
+    ORDER BY dd.full_date DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+# The window count gives the total number of matches (for pagination
+# info) from the same scan
+SEARCH_MESSAGES_SQL = text("""
+    SELECT 
+        fm.message_id,
+        dc.channel_name,
+        fm.message_text,
+        fm.message_date,
+        fm.view_count,
+        fm.forward_count,
+        fm.has_image,
+        COUNT(*) OVER () AS total_found
+    FROM marts.fct_messages fm
+    INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
+    WHERE fm.message_text ILIKE :query
+    ORDER BY fm.message_date DESC
+    LIMIT :limit
+""")
+
+# Identity and write counters of every marts table (see _warehouse_version)
+WAREHOUSE_VERSION_SQL = text("""
+    SELECT COALESCE(STRING_AGG(
+        c.oid::text || ':'
+            || COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text,
+        ',' ORDER BY c.relname
+    ), '')
+    FROM pg_class c
+    INNER JOIN pg_namespace n ON c.relnamespace = n.oid
+    LEFT JOIN pg_stat_user_tables s ON c.oid = s.relid
+    WHERE n.nspname = 'marts'
+        AND c.relkind = 'r'
+""")
+
+# Per-channel statistics plus the grand total row in one pass;
+# percentages are computed server-side (NULLIF guards empty channels)
+VISUAL_STATS_SQL = text("""
+    SELECT 
+        dc.channel_name,
+        GROUPING(dc.channel_name) as is_total,
+        COUNT(fid.message_id) as total_images,
+        COUNT(CASE WHEN fid.image_category = 'promotional' THEN 1 END) as promotional_count,
+        COUNT(CASE WHEN fid.image_category = 'product_display' THEN 1 END) as product_display_count,
+        COUNT(CASE WHEN fid.image_category = 'lifestyle' THEN 1 END) as lifestyle_count,
+        COUNT(CASE WHEN fid.image_category = 'other' THEN 1 END) as other_count,
+        COALESCE(ROUND(
+            COUNT(CASE WHEN fid.image_category = 'promotional' THEN 1 END) * 100.0
+            / NULLIF(COUNT(fid.message_id), 0), 2
+        ), 0) as promotional_percentage,
+        COALESCE(ROUND(
+            COUNT(CASE WHEN fid.image_category = 'product_display' THEN 1 END) * 100.0
+            / NULLIF(COUNT(fid.message_id), 0), 2
+        ), 0) as product_display_percentage
+    FROM marts.fct_image_detections fid
+    INNER JOIN marts.dim_channels dc ON fid.channel_key = dc.channel_key
+    GROUP BY GROUPING SETS ((dc.channel_name), ())
+    ORDER BY is_total, total_images DESC
+""")
 
 
 # ============================================================================
@@ -104,64 +376,34 @@ def extract_product_terms(message_text: str) -> List[str]:
     Returns the most frequently mentioned terms/products across all channels.
     
     This endpoint analyzes message text to extract and count product mentions,
-    returning the most common terms.
+    returning the most common terms. Results come from the agg_top_terms mart
+    when it has been built; `refreshed_at` reports when it was last refreshed.
     """,
     tags=["Reports"],
 )
 async def get_top_products(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100, description="Maximum number of products to return"),
-    db: Session = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):
     """
     Get top products/terms mentioned across all channels.
     """
+    async def compute():
+        async with session_factory() as db:
+            return await _compute_top_products(db, limit)
+    
     try:
-        # Query all messages with text
-        query = text("""
-            SELECT message_text
-            FROM marts.fct_messages
-            WHERE message_text IS NOT NULL
-                AND LENGTH(TRIM(message_text)) > 0
-        """)
-        
-        result = db.execute(query)
-        messages = result.fetchall()
+        version = await _warehouse_version(session_factory)
+        etag = _report_etag(request, version)
+        cache_headers = {"ETag": etag, "Cache-Control": REPORT_CACHE_CONTROL}
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=cache_headers)
         
-        # Extract terms from all messages
-        all_terms = []
-        for (message_text,) in messages:
-            terms = extract_product_terms(message_text)
-            all_terms.extend(terms)
-        
-        # Count term frequencies
-        term_counter = Counter(all_terms)
-        
-        # Get top terms
-        top_terms = term_counter.most_common(limit)
-        
-        # Get channels where each term appears
-        products = []
-        for term, frequency in top_terms:
-            # Find channels where this term appears
-            channel_query = text("""
-                SELECT DISTINCT dc.channel_name
-                FROM marts.fct_messages fm
-                INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
-                WHERE LOWER(fm.message_text) LIKE LOWER(:term)
-            """)
-            channel_result = db.execute(channel_query, {"term": f"%{term}%"})
-            channels = [row[0] for row in channel_result.fetchall()]
-            
-            products.append(ProductItem(
-                term=term,
-                frequency=frequency,
-                channels=channels,
-            ))
-        
-        return TopProductsResponse(
-            limit=limit,
-            total_terms=len(term_counter),
-            products=products,
+        response.headers.update(cache_headers)
+        return await _cached(
+            _top_products_cache, _top_products_lock, (version, limit), compute
         )
     
     except Exception as e:
@@ -171,6 +413,125 @@ async def get_top_products(
         )
 
 
+async def _compute_top_products(db: AsyncSession, limit: int) -> TopProductsResponse:
+    """
+    Compute the top products response from the database.
+    """
+    # Prefer the pre-aggregated mart built by dbt (agg_top_terms)
+    mart_exists = (
+        await db.execute(TABLE_EXISTS_SQL, {"table_name": "agg_top_terms"})
+    ).scalar()
+    
+    if mart_exists:
+        return await _top_products_from_mart(db, limit)
+    
+    return await _top_products_live(db, limit)
+
+
+async def _top_products_from_mart(db: AsyncSession, limit: int) -> TopProductsResponse:
+    """
+    Read top products from the marts.agg_top_terms table.
+    """
+    result = await db.execute(TOP_TERMS_MART_SQL, {"limit": limit})
+    rows = result.all()
+    
+    products = [
+        ProductItem(term=row[0], frequency=row[1], channels=list(row[2]))
+        for row in rows
+    ]
+    
+    return TopProductsResponse(
+        limit=limit,
+        total_terms=rows[0][4] if rows else 0,
+        refreshed_at=rows[0][3] if rows else None,
+        products=products,
+    )
+
+
+async def _top_products_live(db: AsyncSession, limit: int) -> TopProductsResponse:
+    """
+    Compute top products from fct_messages with a single SQL aggregation.
+    
+    Used until the agg_top_terms mart has been built.
+    """
+    try:
+        result = await db.execute(
+            TOP_TERMS_SQL,
+            {"stop_words": STOP_WORDS, "limit": limit},
+        )
+        rows = result.all()
+    except DBAPIError:
+        # Database could not run the aggregation (e.g. regex support);
+        # fall back to extracting terms in Python.
+        await db.rollback()
+        return await _top_products_in_python(db, limit)
+    
+    products = [
+        ProductItem(term=row[0], frequency=row[1], channels=list(row[2]))
+        for row in rows
+    ]
+    
+    return TopProductsResponse(
+        limit=limit,
+        total_terms=rows[0][3] if rows else 0,
+        products=products,
+    )
+
+
+def _count_terms(term_counter: Counter, rows) -> None:
+    """
+    Add the product terms of a batch of (message_text,) rows to the counter.
+    """
+    # One update call over a generator of every term in the batch
+    term_counter.update(
+        term
+        for (message_text,) in rows
+        for term in extract_product_terms(message_text)
+    )
+
+
+async def _top_products_in_python(db: AsyncSession, limit: int) -> TopProductsResponse:
+    """
+    Compute top products by extracting terms in Python.
+    
+    Fallback for get_top_products when the SQL aggregation is unavailable.
+    """
+    # Stream rows through a server-side cursor instead of materializing
+    # every message. Term extraction is CPU-bound, so each batch is counted
+    # in the threadpool to keep the event loop serving other requests.
+    result = await db.stream(MESSAGE_TEXTS_SQL.execution_options(yield_per=1000))
+    term_counter = Counter()
+    async for rows in result.partitions():
+        await run_in_threadpool(_count_terms, term_counter, rows)
+    
+    # Get top terms
+    top_terms = term_counter.most_common(limit)
+    
+    # Get channels where each term appears, for all top terms in one query
+    channels_by_term = {}
+    if top_terms:
+        channel_result = await db.execute(
+            TERM_CHANNELS_SQL,
+            {"terms": [term for term, _ in top_terms]},
+        )
+        channels_by_term = {row[0]: list(row[1]) for row in channel_result.all()}
+    
+    products = [
+        ProductItem(
+            term=term,
+            frequency=frequency,
+            channels=channels_by_term.get(term, []),
+        )
+        for term, frequency in top_terms
+    ]
+    
+    return TopProductsResponse(
+        limit=limit,
+        total_terms=len(term_counter),
+        products=products,
+    )
+
+
 # ============================================================================
 # Endpoint 2: Channel Activity
 # ============================================================================
@@ -182,32 +543,46 @@ async def get_top_products(
     description="""
     Returns posting activity and trends for a specific channel.
     
-    Includes daily breakdown of messages, views, and forwards.
+    Includes daily breakdown of messages, views, and forwards, newest first.
+    The daily series can be restricted with `start_date`/`end_date` and is
+    paginated with `limit`/`offset`; `has_more` tells whether more days remain.
     """,
     tags=["Channels"],
 )
 async def get_channel_activity(
     channel_name: str,
-    db: Session = Depends(get_db),
+    start_date: Optional[date] = Query(None, description="First day of the daily series (inclusive)"),
+    end_date: Optional[date] = Query(None, description="Last day of the daily series (inclusive)"),
+    limit: int = Query(90, ge=1, le=365, description="Maximum number of days to return"),
+    offset: int = Query(0, ge=0, description="Number of days to skip"),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):
     """
     Get activity statistics for a specific channel.
     """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=400,
+            detail="start_date must be on or before end_date"
+        )
+    
     try:
-        # Get channel information
-        channel_query = text("""
-            SELECT 
-                channel_name,
-                channel_type,
-                total_posts,
-                first_post_date,
-                last_post_date,
-                avg_views
-            FROM marts.dim_channels
-            WHERE channel_name = :channel_name
-        """)
+        # The two queries are independent, so run them concurrently on
+        # separate sessions (a single session serializes its queries)
+        # One extra day is fetched to tell whether another page exists
+        daily_params = {
+            "channel_name": channel_name,
+            "start_key": _date_key(start_date) if start_date else 0,
+            "end_key": _date_key(end_date) if end_date else 99991231,
+            "limit": limit + 1,
+            "offset": offset,
+        }
+        async with session_factory() as channel_db, session_factory() as daily_db:
+            channel_result, daily_result = await asyncio.gather(
+                channel_db.execute(CHANNEL_INFO_SQL, {"channel_name": channel_name}),
+                daily_db.execute(DAILY_ACTIVITY_SQL, daily_params),
+            )
         
-        channel_result = db.execute(channel_query, {"channel_name": channel_name})
         channel_row = channel_result.fetchone()
         
         if not channel_row:
@@ -216,33 +591,8 @@ async def get_channel_activity(
                 detail=f"Channel '{channel_name}' not found"
             )
         
-        # Get daily activity
-        daily_query = text("""
-            SELECT 
-                dd.full_date as date,
-                COUNT(fm.message_id) as message_count,
-                SUM(fm.view_count) as total_views,
-                AVG(fm.view_count) as avg_views,
-                SUM(fm.forward_count) as total_forwards
-            FROM marts.fct_messages fm
-            INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
-            INNER JOIN marts.dim_dates dd ON fm.date_key = dd.date_key
-            WHERE dc.channel_name = :channel_name
-            GROUP BY dd.full_date
-            ORDER BY dd.full_date DESC
-        """)
-        
-        daily_result = db.execute(daily_query, {"channel_name": channel_name})
-        daily_activities = []
-        
-        for row in daily_result.fetchall():
-            daily_activities.append(DailyActivity(
-                date=row[0],
-                message_count=row[1],
-                total_views=row[2],
-                avg_views=float(row[3]) if row[3] else 0.0,
-                total_forwards=row[4],
-            ))
+        daily_rows = daily_result.mappings().all()
+        daily_activities = _DAILY_ACTIVITY_LIST.validate_python(daily_rows[:limit])
         
         return ChannelActivityResponse(
             channel_name=channel_row[0],
@@ -252,6 +602,7 @@ async def get_channel_activity(
             last_post_date=channel_row[4],
             avg_views=float(channel_row[5]) if channel_row[5] else 0.0,
             daily_activity=daily_activities,
+            has_more=len(daily_rows) > limit,
         )
     
     except HTTPException:
@@ -281,55 +632,22 @@ async def get_channel_activity(
 async def search_messages(
     query: str = Query(..., min_length=2, description="Search keyword"),
     limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
-    db: Session = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):
     """
     Search for messages containing a specific keyword.
     """
     try:
-        # Search messages
-        search_query = text("""
-            SELECT 
-                fm.message_id,
-                dc.channel_name,
-                fm.message_text,
-                fm.message_date,
-                fm.view_count,
-                fm.forward_count,
-                fm.has_image
-            FROM marts.fct_messages fm
-            INNER JOIN marts.dim_channels dc ON fm.channel_key = dc.channel_key
-            WHERE LOWER(fm.message_text) LIKE LOWER(:query)
-            ORDER BY fm.message_date DESC
-            LIMIT :limit
-        """)
-        
-        result = db.execute(
-            search_query,
-            {"query": f"%{query}%", "limit": limit}
-        )
-        
-        messages = []
-        for row in result.fetchall():
-            messages.append(MessageResult(
-                message_id=row[0],
-                channel_name=row[1],
-                message_text=row[2],
-                message_date=row[3],
-                view_count=row[4],
-                forward_count=row[5],
-                has_image=row[6],
-            ))
-        
-        # Get total count (for pagination info)
-        count_query = text("""
-            SELECT COUNT(*)
-            FROM marts.fct_messages fm
-            WHERE LOWER(fm.message_text) LIKE LOWER(:query)
-        """)
+        # Return the connection to the pool before building the response
+        async with session_factory() as db:
+            result = await db.execute(
+                SEARCH_MESSAGES_SQL,
+                {"query": f"%{query}%", "limit": limit}
+            )
+            rows = result.mappings().all()
         
-        count_result = db.execute(count_query, {"query": f"%{query}%"})
-        total_found = count_result.scalar()
+        total_found = rows[0]["total_found"] if rows else 0
+        messages = _MESSAGE_RESULT_LIST.validate_python(rows)
         
         return MessageSearchResponse(
             query=query,
@@ -362,94 +680,27 @@ async def search_messages(
     tags=["Reports"],
 )
 async def get_visual_content_stats(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
 ):
     """
     Get visual content statistics across all channels.
     """
+    async def compute():
+        async with session_factory() as db:
+            return await _compute_visual_content_stats(db)
+    
     try:
-        # Check if fct_image_detections exists
-        check_query = text("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'marts' 
-                AND table_name = 'fct_image_detections'
-            )
-        """)
-        
-        table_exists = db.execute(check_query).scalar()
-        
-        if not table_exists:
-            # Return empty stats if table doesn't exist
-            return VisualContentStatsResponse(
-                total_images=0,
-                channels=[],
-                category_summary={
-                    "promotional": 0,
-                    "product_display": 0,
-                    "lifestyle": 0,
-                    "other": 0,
-                },
-            )
-        
-        # Get channel-level statistics
-        channel_query = text("""
-            SELECT 
-                dc.channel_name,
-                COUNT(fid.message_id) as total_images,
-                COUNT(CASE WHEN fid.image_category = 'promotional' THEN 1 END) as promotional_count,
-                COUNT(CASE WHEN fid.image_category = 'product_display' THEN 1 END) as product_display_count,
-                COUNT(CASE WHEN fid.image_category = 'lifestyle' THEN 1 END) as lifestyle_count,
-                COUNT(CASE WHEN fid.image_category = 'other' THEN 1 END) as other_count
-            FROM marts.fct_image_detections fid
-            INNER JOIN marts.dim_channels dc ON fid.channel_key = dc.channel_key
-            GROUP BY dc.channel_name
-            ORDER BY total_images DESC
-        """)
-        
-        channel_result = db.execute(channel_query)
+        version = await _warehouse_version(session_factory)
+        etag = _report_etag(request, version)
+        cache_headers = {"ETag": etag, "Cache-Control": REPORT_CACHE_CONTROL}
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=cache_headers)
         
-        channels = []
-        total_images = 0
-        category_counts = {
-            "promotional": 0,
-            "product_display": 0,
-            "lifestyle": 0,
-            "other": 0,
-        }
-        
-        for row in channel_result.fetchall():
-            channel_name = row[0]
-            total = row[1]
-            promotional = row[2]
-            product_display = row[3]
-            lifestyle = row[4]
-            other = row[5]
-            
-            total_images += total
-            category_counts["promotional"] += promotional
-            category_counts["product_display"] += product_display
-            category_counts["lifestyle"] += lifestyle
-            category_counts["other"] += other
-            
-            promotional_pct = (promotional / total * 100) if total > 0 else 0.0
-            product_display_pct = (product_display / total * 100) if total > 0 else 0.0
-            
-            channels.append(ChannelVisualStats(
-                channel_name=channel_name,
-                total_images=total,
-                promotional_count=promotional,
-                product_display_count=product_display,
-                lifestyle_count=lifestyle,
-                other_count=other,
-                promotional_percentage=round(promotional_pct, 2),
-                product_display_percentage=round(product_display_pct, 2),
-            ))
-        
-        return VisualContentStatsResponse(
-            total_images=total_images,
-            channels=channels,
-            category_summary=category_counts,
+        response.headers.update(cache_headers)
+        return await _cached(
+            _visual_content_cache, _visual_content_lock, version, compute
         )
     
     except Exception as e:
@@ -459,6 +710,46 @@ async def get_visual_content_stats(
         )
 
 
+async def _compute_visual_content_stats(db: AsyncSession) -> VisualContentStatsResponse:
+    """
+    Compute the visual content statistics response from the database.
+    """
+    # Check if fct_image_detections exists
+    table_exists = (
+        await db.execute(TABLE_EXISTS_SQL, {"table_name": "fct_image_detections"})
+    ).scalar()
+    
+    if not table_exists:
+        # Return empty stats if table doesn't exist
+        return VisualContentStatsResponse(
+            total_images=0,
+            channels=[],
+            category_summary={
+                "promotional": 0,
+                "product_display": 0,
+                "lifestyle": 0,
+                "other": 0,
+            },
+        )
+    
+    rows = (await db.execute(VISUAL_STATS_SQL)).mappings().all()
+    
+    # The grand total row (GROUPING = 1) sorts last and is always present
+    totals = rows[-1]
+    channels = _CHANNEL_VISUAL_STATS_LIST.validate_python(rows[:-1])
+    
+    return VisualContentStatsResponse(
+        total_images=totals["total_images"],
+        channels=channels,
+        category_summary={
+            "promotional": totals["promotional_count"],
+            "product_display": totals["product_display_count"],
+            "lifestyle": totals["lifestyle_count"],
+            "other": totals["other_count"],
+        },
+    )
+
+
 # ============================================================================
 # Health Check Endpoint
 # ============================================================================
@@ -469,19 +760,22 @@ async def get_visual_content_stats(
     description="Check if the API is running and can connect to the database.",
     tags=["Health"],
 )
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
     """
     Health check endpoint.
     """
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        async with session_factory() as db:
+            await db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
             "database": "connected",
         }
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -2,6 +2,7 @@
 Pydantic schemas for request/response validation.
 """
 
+import datetime as dt
 from datetime import date, datetime
 from typing import List, Optional
 
@@ -23,6 +24,9 @@ class TopProductsResponse(BaseModel):
     """Response for top products endpoint."""
     limit: int = Field(..., description="Number of results returned")
     total_terms: int = Field(..., description="Total unique terms found")
+    refreshed_at: Optional[datetime] = Field(
+        None, description="When the pre-aggregated terms were last refreshed (null if computed live)"
+    )
     products: List[ProductItem] = Field(..., description="List of top products")
 
 
@@ -32,7 +36,8 @@ class TopProductsResponse(BaseModel):
 
 class DailyActivity(BaseModel):
     """Daily posting activity for a channel."""
-    date: date = Field(..., description="Date of activity")
+    # Annotated via the module: the field name would shadow the date type
+    date: dt.date = Field(..., description="Date of activity")
     message_count: int = Field(..., description="Number of messages posted")
     total_views: int = Field(..., description="Total views for the day")
     avg_views: float = Field(..., description="Average views per message")
@@ -48,6 +53,7 @@ class ChannelActivityResponse(BaseModel):
     last_post_date: date = Field(..., description="Date of most recent post")
     avg_views: float = Field(..., description="Average views per post")
     daily_activity: List[DailyActivity] = Field(..., description="Daily activity breakdown")
+    has_more: bool = Field(False, description="Whether more days exist beyond this page")
 
 
 # ============================================================================
@@ -0,0 +1,60 @@
+{{
+    config(
+        materialized='table',
+        schema='marts',
+        post_hook="create index on {{ this }} (frequency desc)"
+    )
+}}
+
+-- Aggregate table of product/term mentions for the top-products API endpoint
+-- Term rules match extract_product_terms in api/main.py:
+-- words of 3+ characters that are ALL CAPS, contain a digit,
+-- or are capitalized and longer than 4 characters, excluding stop words.
+-- Capitals are the ASCII A-Z, as in _TERM_RE; which non-ASCII characters
+-- \w and \d match depends on the database locale
+
+{% set stop_words = [
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'from', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'can', 'this', 'that', 'these', 'those', 'a', 'an', 'as',
+] %}
+
+with words as (
+    select
+        fm.channel_key,
+        m.match[1] as term
+    from {{ ref('fct_messages') }} fm
+    cross join lateral regexp_matches(fm.message_text, '(\w+)', 'g') as m(match)
+    where length(trim(fm.message_text)) > 0
+),
+
+product_terms as (
+    select
+        channel_key,
+        term
+    from words
+    where length(term) >= 3
+        and lower(term) not in (
+            {%- for word in stop_words %}'{{ word }}'{% if not loop.last %}, {% endif %}{% endfor -%}
+        )
+        and (
+            -- All caps (often product names)
+            term ~ '^[A-Z_]*[A-Z][A-Z_]*$'
+            -- Words with numbers
+            or term ~ '\d'
+            -- Capitalized words (potential product names)
+            or (length(term) > 4 and term ~ '^[A-Z]')
+        )
+)
+
+select
+    pt.term,
+    count(*) as frequency,
+    array_agg(distinct dc.channel_name) as channels,
+    current_timestamp as refreshed_at
+
+from product_terms pt
+inner join {{ ref('dim_channels') }} dc
+    on pt.channel_key = dc.channel_key
+group by pt.term
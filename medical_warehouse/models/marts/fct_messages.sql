@@ -1,10 +1,19 @@
 {{
     config(
         materialized='table',
-        schema='marts'
+        schema='marts',
+        post_hook=[
+            "create extension if not exists pg_trgm",
+            "create index on {{ this }} using gin (message_text gin_trgm_ops)",
+            "create index on {{ this }} (channel_key, date_key)",
+        ]
     )
 }}
 
+-- The trigram index lets the API's ILIKE '%keyword%' searches use an
+-- index instead of scanning every message; the (channel_key, date_key)
+-- index serves the API's per-channel daily activity range queries
+
 with staging_messages as (
     select * from {{ ref('stg_telegram_messages') }}
 ),
@@ -1,7 +1,9 @@
 {{
     config(
-        materialized='view',
-        schema='staging'
+        materialized='incremental',
+        schema='staging',
+        unique_key=['message_id', 'channel_name', 'message_date'],
+        incremental_strategy='delete+insert'
     )
 }}
 
@@ -10,6 +12,7 @@
 -- 1. Type casting (dates, integers, booleans)
 -- 2. Invalid record filtering (nulls, empty messages)
 -- 3. Data standardization (coalesce, calculated fields)
+-- Incremental runs only process rows loaded since the previous run
 
 with raw_messages as (
     select
@@ -30,6 +33,9 @@ with raw_messages as (
     where message_id is not null
         and channel_name is not null
         and message_date is not null
+    {% if is_incremental() %}
+        and loaded_at > (select max(loaded_at) from {{ this }})
+    {% endif %}
 )
 
 select
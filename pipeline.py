@@ -8,22 +8,180 @@ This pipeline orchestrates the entire data workflow:
 4. Transform data with dbt
 """
 
+import hashlib
 import os
-import subprocess
+import shutil
 import sys
 from pathlib import Path
 from typing import Any
 
 from dagster import (
+    DagsterRunStatus,
     Definitions,
+    Failure,
+    In,
+    InitResourceContext,
+    Nothing,
     OpExecutionContext,
+    RunRequest,
+    RunsFilter,
     ScheduleDefinition,
+    SensorEvaluationContext,
+    SkipReason,
     job,
+    multiprocess_executor,
     op,
+    resource,
+    sensor,
 )
+from sqlalchemy import text
 
 # Get the base directory
 BASE_DIR = Path(__file__).parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# Pipeline steps run in-process instead of in a fresh interpreter each.
+# The scraper (telethon), YOLO (ultralytics/torch/cv2) and dbt are imported
+# inside the ops that use them, since the multiprocess executor imports
+# this module again in every op's subprocess.
+from scripts import load_raw_to_postgres as raw_loader
+from scripts import load_yolo_detections as yolo_loader
+from src.db import get_engine
+
+# Inputs of the YOLO step, located without importing src.yolo_detect
+YOLO_DETECT_FILE = BASE_DIR / "src" / "yolo_detect.py"
+YOLO_IMAGES_DIR = BASE_DIR / "data" / "raw" / "images"  # yolo_detect.IMAGES_DIR
+
+# dbt project built by run_dbt_transformations
+DBT_PROJECT_DIR = BASE_DIR / "medical_warehouse"
+
+
+@resource(description="SQLAlchemy engine shared by all loader ops in a run")
+def warehouse_engine(init_context: InitResourceContext):
+    """Hand out the process-wide engine, with the step marker table in place, and close its pooled connections afterwards."""
+    engine = get_engine()
+    ensure_step_runs_table(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+# ============================================================================
+# Step memoization
+# ============================================================================
+# A step is skipped when its inputs (data files and the code that processes
+# them) are unchanged since its last successful run.
+
+STEP_RUNS_TABLE = "raw.pipeline_step_runs"
+
+
+def input_fingerprint(*paths: Path) -> str:
+    """
+    Hash the path, size and modification time of every file under paths.
+    
+    Reading metadata instead of file contents keeps this cheap on large
+    image directories while still changing whenever a file is added,
+    removed or rewritten.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for root in paths:
+        files = sorted(root.rglob("*")) if root.is_dir() else [root]
+        for path in files:
+            if path.is_file():
+                stat = path.stat()
+                digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def raw_load_input_hash() -> str:
+    """Fingerprint the inputs of load_raw_to_postgres."""
+    return input_fingerprint(raw_loader.DATA_DIR, Path(raw_loader.__file__))
+
+
+def yolo_input_hash() -> str:
+    """Fingerprint the inputs of run_yolo_enrichment."""
+    return input_fingerprint(
+        YOLO_IMAGES_DIR, YOLO_DETECT_FILE, Path(yolo_loader.__file__)
+    )
+
+
+def dbt_input_hash(load_hash: str, yolo_hash: str) -> str:
+    """
+    Fingerprint the inputs of run_dbt_transformations.
+    
+    dbt reads the raw tables, i.e. the inputs of the two loads, and builds
+    them with the project's models, macros, tests and configuration.
+    """
+    project_hash = input_fingerprint(
+        DBT_PROJECT_DIR / "models",
+        DBT_PROJECT_DIR / "macros",
+        DBT_PROJECT_DIR / "tests",
+        DBT_PROJECT_DIR / "dbt_project.yml",
+        DBT_PROJECT_DIR / "packages.yml",
+    )
+    return hashlib.blake2b(
+        f"{load_hash}|{yolo_hash}|{project_hash}".encode(), digest_size=16
+    ).hexdigest()
+
+
+def ensure_step_runs_table(engine) -> None:
+    """
+    Create the step marker table, or switch an old logged one to UNLOGGED.
+    
+    The catalog is checked first, so the DDL (and the ACCESS EXCLUSIVE
+    lock of ALTER TABLE) only runs when something actually has to change.
+    """
+    with engine.begin() as conn:
+        persistence = conn.execute(
+            text("SELECT relpersistence FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": STEP_RUNS_TABLE},
+        ).scalar()
+        if persistence == "u":
+            return
+        
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS raw"))
+        # UNLOGGED like the raw tables the markers describe: a crash
+        # truncates both, so the loads run again instead of being skipped
+        # over empty tables
+        conn.execute(text(f"""
+            CREATE UNLOGGED TABLE IF NOT EXISTS {STEP_RUNS_TABLE} (
+                step_name VARCHAR(100),
+                input_hash VARCHAR(64),
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (step_name, input_hash)
+            );
+            
+            -- Tables created before the switch to UNLOGGED
+            ALTER TABLE {STEP_RUNS_TABLE} SET UNLOGGED;
+        """))
+
+
+def step_already_ran(engine, step_name: str, input_hash: str) -> bool:
+    """Check whether step_name already completed for input_hash."""
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"""
+                SELECT 1 FROM {STEP_RUNS_TABLE}
+                WHERE step_name = :step_name AND input_hash = :input_hash
+            """),
+            {"step_name": step_name, "input_hash": input_hash},
+        ).first() is not None
+
+
+def record_step_run(engine, step_name: str, input_hash: str) -> None:
+    """Remember that step_name completed for input_hash."""
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"""
+                INSERT INTO {STEP_RUNS_TABLE} (step_name, input_hash)
+                VALUES (:step_name, :input_hash)
+                ON CONFLICT (step_name, input_hash)
+                DO UPDATE SET completed_at = CURRENT_TIMESTAMP
+            """),
+            {"step_name": step_name, "input_hash": input_hash},
+        )
 
 
 @op(
@@ -34,127 +192,100 @@ def scrape_telegram_data(context: OpExecutionContext) -> dict:
     """Run the Telegram scraper to collect messages and images."""
     context.log.info("Starting Telegram data scraping...")
     
-    scraper_script = BASE_DIR / "src" / "scraper.py"
-    
-    if not scraper_script.exists():
-        raise FileNotFoundError(f"Scraper script not found: {scraper_script}")
-    
     try:
-        # Run the scraper script
-        result = subprocess.run(
-            [sys.executable, str(scraper_script)],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        
-        context.log.info("Telegram scraping completed successfully")
-        context.log.debug(f"Scraper output: {result.stdout}")
+        from src import scraper
         
-        return {
-            "status": "success",
-            "message": "Telegram data scraped successfully",
-        }
+        result = scraper.run()
+    except Exception as e:
+        context.log.error(f"Scraper failed: {e}")
+        raise Failure(description=f"Telegram scraping failed: {e}") from e
     
-    except subprocess.CalledProcessError as e:
-        context.log.error(f"Scraper failed: {e.stderr}")
-        raise
+    context.log.info("Telegram scraping completed successfully")
+    return result
 
 
 @op(
     description="Load raw JSON data from data lake to PostgreSQL",
+    # Waits for the scrape in the full pipeline; the refresh job has none
+    ins={"scrape_result": In(Nothing)},
     tags={"component": "loader", "stage": "load"},
+    required_resource_keys={"warehouse_engine"},
 )
-def load_raw_to_postgres(context: OpExecutionContext, scrape_result: dict) -> dict:
+def load_raw_to_postgres(context: OpExecutionContext) -> dict:
     """Load raw JSON files to PostgreSQL database."""
-    context.log.info("Loading raw data to PostgreSQL...")
+    engine = context.resources.warehouse_engine
+    input_hash = raw_load_input_hash()
     
-    loader_script = BASE_DIR / "scripts" / "load_raw_to_postgres.py"
+    if step_already_ran(engine, "load_raw_to_postgres", input_hash):
+        context.log.info("Raw JSON files unchanged since the last load, skipping")
+        return {"status": "cached", "message": "Raw data unchanged", "input_hash": input_hash}
     
-    if not loader_script.exists():
-        raise FileNotFoundError(f"Loader script not found: {loader_script}")
+    context.log.info("Loading raw data to PostgreSQL...")
     
     try:
-        result = subprocess.run(
-            [sys.executable, str(loader_script)],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        
-        context.log.info("Data loading completed successfully")
-        context.log.debug(f"Loader output: {result.stdout}")
-        
-        return {
-            "status": "success",
-            "message": "Raw data loaded to PostgreSQL successfully",
-        }
+        result = raw_loader.run(engine=engine, log=context.log.info)
+    except Exception as e:
+        context.log.error(f"Data loading failed: {e}")
+        raise Failure(description=f"Raw data loading failed: {e}") from e
     
-    except subprocess.CalledProcessError as e:
-        context.log.error(f"Data loading failed: {e.stderr}")
-        raise
+    record_step_run(engine, "load_raw_to_postgres", input_hash)
+    context.log.info(f"Data loading completed: {result['message']}")
+    return {**result, "input_hash": input_hash}
 
 
 @op(
     description="Run YOLO object detection on images and load results to database",
-    tags={"component": "yolo", "stage": "enrich"},
+    ins={"scrape_result": In(Nothing)},
+    # Inference gets its own slot so it never competes with another YOLO step
+    tags={"component": "yolo", "stage": "enrich", "resource/gpu": "1"},
+    required_resource_keys={"warehouse_engine"},
 )
-def run_yolo_enrichment(context: OpExecutionContext, scrape_result: dict) -> dict:
+def run_yolo_enrichment(context: OpExecutionContext) -> dict:
     """Run YOLO object detection and load detections to PostgreSQL."""
-    context.log.info("Starting YOLO object detection...")
+    engine = context.resources.warehouse_engine
+    input_hash = yolo_input_hash()
     
-    # Step 1: Run YOLO detection
-    yolo_script = BASE_DIR / "src" / "yolo_detect.py"
+    # Inference is the most expensive step; skip it when no image changed
+    if step_already_ran(engine, "run_yolo_enrichment", input_hash):
+        context.log.info("Images unchanged since the last YOLO run, skipping")
+        return {"status": "cached", "message": "Images unchanged", "input_hash": input_hash}
     
-    if not yolo_script.exists():
-        raise FileNotFoundError(f"YOLO script not found: {yolo_script}")
+    context.log.info("Starting YOLO object detection...")
     
     try:
+        # Step 1: Run YOLO detection
         context.log.info("Running YOLO detection on images...")
-        result = subprocess.run(
-            [sys.executable, str(yolo_script)],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        
-        context.log.info("YOLO detection completed")
-        context.log.debug(f"YOLO output: {result.stdout}")
+        from src import yolo_detect
         
-        # Step 2: Load YOLO detections to database
-        loader_script = BASE_DIR / "scripts" / "load_yolo_detections.py"
+        detection_result = yolo_detect.run()
+        context.log.info(f"YOLO detection completed: {detection_result['message']}")
         
-        if not loader_script.exists():
-            raise FileNotFoundError(f"YOLO loader script not found: {loader_script}")
+        if detection_result["status"] == "skipped":
+            return {**detection_result, "input_hash": input_hash}
         
+        # Step 2: Load YOLO detections to database
         context.log.info("Loading YOLO detections to PostgreSQL...")
-        result = subprocess.run(
-            [sys.executable, str(loader_script)],
-            cwd=str(BASE_DIR),
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        
-        context.log.info("YOLO enrichment completed successfully")
-        context.log.debug(f"YOLO loader output: {result.stdout}")
-        
-        return {
-            "status": "success",
-            "message": "YOLO enrichment completed successfully",
-        }
+        yolo_loader.run(engine=engine)
+    
+    except Exception as e:
+        context.log.error(f"YOLO enrichment failed: {e}")
+        raise Failure(description=f"YOLO enrichment failed: {e}") from e
+    
+    record_step_run(engine, "run_yolo_enrichment", input_hash)
+    context.log.info("YOLO enrichment completed successfully")
     
-    except subprocess.CalledProcessError as e:
-        context.log.error(f"YOLO enrichment failed: {e.stderr}")
-        raise
+    return {
+        "status": "success",
+        "message": "YOLO enrichment completed successfully",
+        "images_processed": detection_result["images_processed"],
+        "input_hash": input_hash,
+    }
 
 
 @op(
     description="Run dbt transformations to create star schema",
     tags={"component": "dbt", "stage": "transform"},
+    required_resource_keys={"warehouse_engine"},
 )
 def run_dbt_transformations(
     context: OpExecutionContext,
@@ -162,81 +293,120 @@ def run_dbt_transformations(
     yolo_result: dict,
 ) -> dict:
     """Execute dbt models to transform raw data into star schema."""
+    engine = context.resources.warehouse_engine
+    input_hash = dbt_input_hash(load_result["input_hash"], yolo_result["input_hash"])
+    
+    # Skip only once dbt itself succeeded on these loads, so a failed dbt
+    # run is retried even though both loads are cached
+    if step_already_ran(engine, "run_dbt_transformations", input_hash):
+        context.log.info("No new raw data, detections or dbt project changes, skipping dbt")
+        return {"status": "cached", "message": "Warehouse already up to date"}
+    
     context.log.info("Starting dbt transformations...")
     
-    dbt_project_dir = BASE_DIR / "medical_warehouse"
+    dbt_project_dir = DBT_PROJECT_DIR
     
     if not dbt_project_dir.exists():
         raise FileNotFoundError(f"dbt project directory not found: {dbt_project_dir}")
     
-    try:
-        # Install dbt dependencies
-        context.log.info("Installing dbt packages...")
-        subprocess.run(
-            ["dbt", "deps"],
-            cwd=str(dbt_project_dir),
-            check=True,
-            capture_output=True,
-        )
+    # profiles.yml lives next to dbt_project.yml
+    project_args = [
+        "--project-dir", str(dbt_project_dir),
+        "--profiles-dir", str(dbt_project_dir),
+    ]
+    
+    from dbt.cli.main import dbtRunner, dbtRunnerResult
+    
+    def invoke(runner: dbtRunner, *args: str) -> dbtRunnerResult:
+        result = runner.invoke([*args, *project_args])
+        if result.exception is not None:
+            raise Failure(f"dbt {args[0]} failed: {result.exception}")
+        return result
+    
+    # Install dbt dependencies
+    context.log.info("Installing dbt packages...")
+    invoke(dbtRunner(), "deps")
+    
+    # Parse the project once; the commands below reuse the manifest
+    # instead of re-parsing it on every invocation
+    manifest = invoke(dbtRunner(), "parse").result
+    runner = dbtRunner(manifest=manifest)
+    
+    # Record when each source last received rows (target/sources.json)
+    invoke(runner, "source", "freshness")
+    
+    state_dir = dbt_project_dir / "target-prod"
+    if (state_dir / "manifest.json").exists():
+        # Only rebuild models whose SQL changed or whose sources got new
+        # rows since the last run; everything else is deferred to the
+        # relations that run built
+        context.log.info("Building modified and fresher models...")
+        selection = [
+            "--select", "state:modified+ source_status:fresher+",
+            "--state", str(state_dir),
+            "--defer",
+        ]
+        if not invoke(runner, "run", *selection).success:
+            raise Failure("dbt run failed for modified models")
         
+        context.log.info("Running dbt tests...")
+        test_result = invoke(runner, "test", *selection)
+    else:
         # Run staging models first
         context.log.info("Building staging models...")
-        subprocess.run(
-            ["dbt", "run", "--select", "staging"],
-            cwd=str(dbt_project_dir),
-            check=True,
-            capture_output=True,
-        )
+        if not invoke(runner, "run", "--select", "staging").success:
+            raise Failure("dbt run failed for staging models")
         
         # Then run marts (dimensions and facts)
         context.log.info("Building marts (dimensions and facts)...")
-        result = subprocess.run(
-            ["dbt", "run", "--select", "marts"],
-            cwd=str(dbt_project_dir),
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        if not invoke(runner, "run", "--select", "marts").success:
+            raise Failure("dbt run failed for marts")
         
         # Run tests
         context.log.info("Running dbt tests...")
-        test_result = subprocess.run(
-            ["dbt", "test"],
-            cwd=str(dbt_project_dir),
-            capture_output=True,
-            text=True,
-        )
-        
-        if test_result.returncode != 0:
-            context.log.warning("Some dbt tests failed. Check output for details.")
-            context.log.debug(f"Test output: {test_result.stdout}")
-        else:
-            context.log.info("All dbt tests passed!")
-        
-        context.log.info("dbt transformations completed successfully")
-        
-        return {
-            "status": "success",
-            "message": "dbt transformations completed successfully",
-        }
+        test_result = invoke(runner, "test")
+    
+    if not test_result.success:
+        context.log.warning("Some dbt tests failed. Check output for details.")
+    else:
+        context.log.info("All dbt tests passed!")
     
-    except subprocess.CalledProcessError as e:
-        context.log.error(f"dbt transformation failed: {e.stderr}")
-        raise
+    # This run's artifacts are the baseline for the next one
+    shutil.copytree(dbt_project_dir / "target", state_dir, dirs_exist_ok=True)
+    
+    record_step_run(engine, "run_dbt_transformations", input_hash)
+    context.log.info("dbt transformations completed successfully")
+    
+    return {
+        "status": "success",
+        "message": "dbt transformations completed successfully",
+    }
+
+
+# Run independent ops in separate processes so the I/O-bound loader and
+# the CPU/GPU-bound YOLO step actually overlap
+PIPELINE_EXECUTOR = multiprocess_executor.configured({
+    "max_concurrent": 4,
+    "tag_concurrency_limits": [
+        {"key": "resource/gpu", "value": "1", "limit": 1},
+    ],
+})
 
 
 @job(
     description="Complete data pipeline: scrape, load, enrich, and transform",
     tags={"pipeline": "medical_telegram_warehouse"},
+    resource_defs={"warehouse_engine": warehouse_engine},
+    executor_def=PIPELINE_EXECUTOR,
 )
 def medical_telegram_pipeline() -> None:
     """
     Main pipeline job that orchestrates all data operations.
     
     Execution order:
-    1. Scrape Telegram data (parallel start)
+    1. Scrape Telegram data
     2. Load raw data to PostgreSQL (depends on scrape)
-    3. Run YOLO enrichment (depends on scrape)
+    3. Run YOLO enrichment (depends on scrape, runs in parallel with 2)
     4. Run dbt transformations (depends on both load and YOLO)
     """
     # Step 1: Scrape Telegram data
@@ -250,12 +420,78 @@ def medical_telegram_pipeline() -> None:
     run_dbt_transformations(load_result, yolo_result)
 
 
-# Schedule: Run daily at 2 AM UTC
-daily_schedule = ScheduleDefinition(
+@job(
+    description="Load, enrich and transform data already in the data lake (no scraping)",
+    tags={"pipeline": "medical_telegram_warehouse"},
+    resource_defs={"warehouse_engine": warehouse_engine},
+    executor_def=PIPELINE_EXECUTOR,
+)
+def warehouse_refresh_job() -> None:
+    """
+    Pipeline without the scrape step, for data written by a standalone
+    scraper (e.g. the Docker scraper service).
+    """
+    run_dbt_transformations(load_raw_to_postgres(), run_yolo_enrichment())
+
+
+# Runs of a job that have not finished yet
+ACTIVE_RUN_STATUSES = [
+    DagsterRunStatus.QUEUED,
+    DagsterRunStatus.NOT_STARTED,
+    DagsterRunStatus.STARTING,
+    DagsterRunStatus.STARTED,
+    DagsterRunStatus.CANCELING,
+]
+
+
+# Sensor: Refresh the warehouse when scraped files land in the data lake
+@sensor(
+    job=warehouse_refresh_job,
+    minimum_interval_seconds=300,
+    description="Launch the refresh job when the data lake has files not yet loaded",
+)
+def telegram_data_sensor(context: SensorEvaluationContext):
+    """
+    Request a run only when the data lake holds files not yet loaded.
+    
+    The sensor checks the same step markers as the loaders, so files
+    already loaded by medical_telegram_pipeline (which scrapes them
+    itself) do not trigger another run. The input hashes double as the run
+    key, so Dagster never launches two runs for the same set of files.
+    
+    No run is requested while either job is still queued or running: a
+    scrape in progress changes the files, and two runs would append to the
+    same detections CSV and build into the same dbt target directory.
+    """
+    for pipeline_job in (medical_telegram_pipeline, warehouse_refresh_job):
+        if context.instance.get_runs(
+            filters=RunsFilter(job_name=pipeline_job.name, statuses=ACTIVE_RUN_STATUSES),
+            limit=1,
+        ):
+            return SkipReason(f"{pipeline_job.name} is already queued or running")
+    
+    if not raw_loader.DATA_DIR.exists():
+        return SkipReason(f"Data lake directory not found: {raw_loader.DATA_DIR}")
+    
+    load_hash = raw_load_input_hash()
+    yolo_hash = yolo_input_hash()
+    engine = get_engine()
+    ensure_step_runs_table(engine)
+    if (
+        step_already_ran(engine, "load_raw_to_postgres", load_hash)
+        and step_already_ran(engine, "run_yolo_enrichment", yolo_hash)
+    ):
+        return SkipReason("Everything in the data lake is already loaded")
+    
+    return RunRequest(run_key=f"{load_hash}-{yolo_hash}")
+
+
+# Schedule: Weekly safety net in case the sensor is paused or misses a change
+weekly_schedule = ScheduleDefinition(
     job=medical_telegram_pipeline,
-    name="daily_pipeline_schedule",
-    cron_schedule="0 2 * * *",  # Daily at 2 AM UTC
-    description="Run the medical telegram data pipeline daily at 2 AM UTC",
+    name="weekly_pipeline_schedule",
+    cron_schedule="0 2 * * 0",  # Sundays at 2 AM UTC
+    description="Run the medical telegram data pipeline weekly at 2 AM UTC",
 )
 
 
@@ -266,6 +502,7 @@ daily_schedule = ScheduleDefinition(
 
 # Define all assets for Dagster
 defs = Definitions(
-    jobs=[medical_telegram_pipeline],
-    schedules=[daily_schedule],
+    jobs=[medical_telegram_pipeline, warehouse_refresh_job],
+    schedules=[weekly_schedule],
+    sensors=[telegram_data_sensor],
 )
@@ -0,0 +1 @@
+"""Loader scripts for the medical telegram data warehouse project."""
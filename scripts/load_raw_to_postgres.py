@@ -3,43 +3,57 @@
 Load raw JSON data from data lake into PostgreSQL raw schema.
 
 This script:
-1. Reads JSON files from data/raw/telegram_messages/
+1. Reads JSON / JSON Lines files from data/raw/telegram_messages/
 2. Loads them into raw.telegram_messages table in PostgreSQL
 3. Handles duplicates and data validation
 """
 
+import io
 import json
 import os
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List
-from urllib.parse import quote_plus
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
-import pandas as pd
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+import psycopg2
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-# Load environment variables
-load_dotenv()
+# Add parent directory to path for imports when running as script
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-# Database connection
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "medical_warehouse")
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
+from src.db import get_engine as get_db_connection
 
+try:
+    # orjson decodes several times faster; its errors subclass json.JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
-def get_db_connection():
-    """Create and return database connection."""
-    # URL-encode password to handle special characters like @
-    encoded_password = quote_plus(POSTGRES_PASSWORD)
-    connection_string = (
-        f"postgresql://{POSTGRES_USER}:{encoded_password}@"
-        f"{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-    )
-    return create_engine(connection_string)
+# Data lake directory with the scraped JSON files
+DATA_DIR = BASE_DIR / "data" / "raw" / "telegram_messages"
+
+# Secondary indexes, dropped for a bulk load and rebuilt afterwards
+RAW_INDEXES = {
+    "idx_message_id": "message_id",
+    "idx_channel_name": "channel_name",
+    "idx_message_date": "message_date",
+}
+
+# maintenance_work_mem for the post-load index builds
+INDEX_BUILD_MEMORY = "1GB"
+
+# The indexes are dropped only when a load adds more than this fraction of
+# the rows already loaded; smaller loads maintain them in place, without
+# locking readers out of the table for the whole load
+INDEX_REBUILD_FRACTION = 0.2
 
 
 def create_raw_schema(engine):
@@ -51,9 +65,15 @@ def create_raw_schema(engine):
 
 
 def create_raw_table(engine):
-    """Create raw.telegram_messages table if it doesn't exist."""
+    """
+    Create raw.telegram_messages table if it doesn't exist.
+    
+    The table is UNLOGGED: it is rebuilt from the data lake, so skipping
+    the WAL roughly halves the write volume of each load at the cost of
+    the table being truncated after a server crash.
+    """
     create_table_sql = """
-    CREATE TABLE IF NOT EXISTS raw.telegram_messages (
+    CREATE UNLOGGED TABLE IF NOT EXISTS raw.telegram_messages (
         id SERIAL PRIMARY KEY,
         message_id BIGINT,
         channel_name VARCHAR(255),
@@ -70,9 +90,8 @@ def create_raw_table(engine):
         UNIQUE(message_id, channel_name, message_date)
     );
     
-    CREATE INDEX IF NOT EXISTS idx_message_id ON raw.telegram_messages(message_id);
-    CREATE INDEX IF NOT EXISTS idx_channel_name ON raw.telegram_messages(channel_name);
-    CREATE INDEX IF NOT EXISTS idx_message_date ON raw.telegram_messages(message_date);
+    -- Tables created before the switch to UNLOGGED (no-op otherwise)
+    ALTER TABLE raw.telegram_messages SET UNLOGGED;
     """
     
     with engine.connect() as conn:
@@ -81,132 +100,366 @@ def create_raw_table(engine):
         print("✓ Raw table created/verified")
 
 
-def load_json_files(data_dir: Path) -> List[Dict]:
-    """Load all JSON files from data lake directory structure."""
-    messages = []
-    json_files = list(data_dir.rglob("*.json"))
-    
-    print(f"Found {len(json_files)} JSON files to process")
+def create_raw_indexes(engine):
+    """
+    Create the lookup indexes on raw.telegram_messages after a load.
     
-    for json_file in json_files:
+    Large loads drop them, since building them once over the loaded table
+    is cheaper than maintaining them row by row; after other loads they
+    already exist and nothing is built. CONCURRENTLY cannot run inside a
+    transaction, hence the autocommit connection.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"SET maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                file_messages = json.load(f)
-                
-                # Handle both single dict and list of dicts
-                if isinstance(file_messages, dict):
-                    file_messages = [file_messages]
-                
-                for msg in file_messages:
-                    if isinstance(msg, dict):
-                        messages.append(msg)
-            
-            print(f"  Loaded {len(file_messages)} messages from {json_file.name}")
-            
-        except json.JSONDecodeError as e:
-            print(f"  ⚠ Error reading {json_file}: {e}")
-            continue
-        except Exception as e:
-            print(f"  ⚠ Error processing {json_file}: {e}")
-            continue
+            for index_name, column in RAW_INDEXES.items():
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                    f"ON raw.telegram_messages({column})"
+                ))
+        finally:
+            conn.execute(text("RESET maintenance_work_mem"))
+    print("✓ Raw table indexes created/verified")
+
+
+def _to_int(value) -> Optional[int]:
+    """Coerce a JSON value to int (None if missing or invalid)."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_bool(value) -> Optional[bool]:
+    """Coerce a JSON value to bool (None if missing or invalid)."""
+    if isinstance(value, (bool, int)):
+        return bool(value)
+    return None
+
+
+# Timestamps PostgreSQL parses as-is: extended ISO 8601 in UTC (or naive),
+# which is what the scraper writes
+_UTC_ISO_TIMESTAMP = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]00:?00)?"
+)
+
+
+# Parts of an ISO 8601 timestamp: date and time, fraction and UTC offset
+_ISO_TIMESTAMP_PARTS = re.compile(
+    r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2})(?:\.(\d{1,6})\d*)?(?:([+-]\d{2}):?(\d{2})?)?"
+)
+
+
+def _normalize_iso_timestamp(value: str) -> str:
+    """
+    Rewrite an ISO 8601 timestamp in the form Python 3.10 can parse.
     
-    return messages
+    Before Python 3.11, datetime.fromisoformat() only accepts a fraction
+    of exactly 3 or 6 digits and an offset written as +HH:MM. Strings that
+    are not ISO 8601 timestamps are returned unchanged.
+    """
+    match = _ISO_TIMESTAMP_PARTS.fullmatch(value)
+    if match is None:
+        return value
+    base, fraction, offset_hours, offset_minutes = match.groups()
+    if fraction:
+        base += "." + fraction.ljust(6, "0")
+    if offset_hours:
+        base += f"{offset_hours}:{offset_minutes or '00'}"
+    return base
+
+
+def _parse_timestamp(value) -> Optional[Tuple[datetime, str]]:
+    """
+    Parse an ISO 8601 string as a naive UTC timestamp.
+    
+    Returns the timestamp as a datetime and as COPY input text, or None
+    if value is not an ISO 8601 string.
+    """
+    if not isinstance(value, str):
+        return None
+    # datetime.fromisoformat() only accepts a Z suffix from Python 3.11
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        # Other forms Python 3.10 rejects (e.g. ".5" or "+0000") are
+        # normalized first; the common case above skips the regex
+        value = _normalize_iso_timestamp(value)
+        try:
+            timestamp = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    # Fast path: the string is already valid COPY input for a UTC
+    # TIMESTAMP column (PostgreSQL drops the zero offset), so skip the
+    # timezone conversion and re-formatting
+    if _UTC_ISO_TIMESTAMP.fullmatch(value):
+        return timestamp.replace(tzinfo=None), value
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, timestamp.isoformat(sep=" ")
+
+
+def _to_timestamp(value) -> Optional[str]:
+    """Parse an ISO 8601 string and return it as a naive UTC timestamp."""
+    parsed = _parse_timestamp(value)
+    return None if parsed is None else parsed[1]
+
+
+# Seconds between progress messages while files are streamed
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+# Columns loaded into raw.telegram_messages and how each JSON value is coerced
+MESSAGE_COLUMNS = {
+    'message_id': _to_int,
+    'channel_name': None,
+    'message_date': _to_timestamp,
+    'message_text': None,
+    'has_media': _to_bool,
+    'image_path': None,
+    'views': _to_int,
+    'forwards': _to_int,
+    'is_reply': _to_bool,
+    'reply_to_msg_id': _to_int,
+    'scraped_at': _to_timestamp,
+}
 
+# COPY text format escapes; PostgreSQL text columns cannot hold NUL
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\x00": None,
+})
 
-def prepare_dataframe(messages: List[Dict]) -> pd.DataFrame:
-    """Convert messages list to DataFrame with proper data types."""
-    if not messages:
-        return pd.DataFrame()
+
+def _copy_line(msg: Dict, message_date: Optional[str]) -> str:
+    """Format a message as a COPY text line, using its already coerced message_date."""
+    values = []
+    for column, convert in MESSAGE_COLUMNS.items():
+        if column == 'message_date':
+            value = message_date
+        else:
+            value = msg.get(column)
+            if convert is not None:
+                value = convert(value)
+        values.append("\\N" if value is None else str(value).translate(_COPY_ESCAPES))
+    return "\t".join(values) + "\n"
+
+
+def format_copy_line(msg: Dict) -> str:
+    """Format one message as a line of COPY text format (NULL as \\N)."""
+    return _copy_line(msg, _to_timestamp(msg.get('message_date')))
+
+
+def iter_json_files(root: Path) -> Iterator[str]:
+    """
+    Yield the path of every .json and .jsonl file under root.
     
-    df = pd.DataFrame(messages)
+    A single os.scandir walk gets the file type from the directory entry
+    itself, so no file is stat'ed and no Path object is built per entry.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith((".json", ".jsonl")):
+                    yield entry.path
+
+
+def read_file_bytes(path: str) -> bytes:
+    """
+    Read a whole file with as few system calls as possible.
     
-    # Convert message_date to datetime
-    if 'message_date' in df.columns:
-        df['message_date'] = pd.to_datetime(df['message_date'], errors='coerce')
+    Path.read_bytes() goes through a buffered file object that keeps
+    reading until it sees EOF; sizing one os.read() from fstat() reads a
+    finished data lake file in a single call.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+
+def read_json_file(
+    json_file: str, loaded_keys: Set[Tuple[int, str, datetime]]
+) -> Tuple[List[str], int]:
+    """
+    Read one data lake JSON file into COPY lines (empty if unreadable).
     
-    # Convert scraped_at to datetime
-    if 'scraped_at' in df.columns:
-        df['scraped_at'] = pd.to_datetime(df['scraped_at'], errors='coerce')
+    .jsonl files hold one message per line; .json files (written before
+    the scraper switched to JSON Lines) hold a list of messages. Messages
+    whose (message_id, channel_name, message_date), the columns of the
+    raw table's UNIQUE constraint, is in loaded_keys are left out.
+    Returns the COPY lines and the number of messages left out.
+    """
+    try:
+        data = read_file_bytes(json_file)
+        if json_file.endswith(".jsonl"):
+            file_messages = [json_loads(line) for line in data.splitlines() if line.strip()]
+        else:
+            file_messages = json_loads(data)
+        
+        # Handle both single dict and list of dicts
+        if isinstance(file_messages, dict):
+            file_messages = [file_messages]
+        
+        messages = [msg for msg in file_messages if isinstance(msg, dict)]
+        lines = []
+        for msg in messages:
+            # message_date is parsed once for both the key and the COPY
+            # line; psycopg2 returns the column as a naive UTC datetime
+            message_date, message_date_text = (
+                _parse_timestamp(msg.get('message_date')) or (None, None)
+            )
+            key = (_to_int(msg.get('message_id')), msg.get('channel_name'), message_date)
+            if key not in loaded_keys:
+                lines.append(_copy_line(msg, message_date_text))
+        return lines, len(messages) - len(lines)
     
-    # Ensure boolean columns
-    bool_columns = ['has_media', 'is_reply']
-    for col in bool_columns:
-        if col in df.columns:
-            df[col] = df[col].astype('boolean', errors='ignore')
+    except json.JSONDecodeError as e:
+        print(f"  ⚠ Error reading {json_file}: {e}")
+    except Exception as e:
+        print(f"  ⚠ Error processing {json_file}: {e}")
+    return [], 0
+
+
+def iter_copy_lines(
+    json_files: List[str],
+    loaded_keys: Set[Tuple[int, str, datetime]],
+    counts: Dict[str, int],
+    log: Callable[[str], None] = print,
+) -> Iterator[str]:
+    """
+    Yield COPY lines for every message in json_files not yet loaded.
     
-    # Ensure integer columns
-    int_columns = ['message_id', 'views', 'forwards', 'reply_to_msg_id']
-    for col in int_columns:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    Files are read and decoded on a thread pool a small batch at a time,
+    so only the batch in flight is held in memory. Messages left out
+    because they are in loaded_keys are tallied in counts["already_loaded"].
+    Progress goes to log at most every PROGRESS_INTERVAL_SECONDS.
+    """
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    batch_size = max_workers * 2
+    files_read = 0
+    last_report = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for i in range(0, len(json_files), batch_size):
+            batch = json_files[i:i + batch_size]
+            for lines, already_loaded in executor.map(
+                read_json_file, batch, repeat(loaded_keys)
+            ):
+                counts["already_loaded"] += already_loaded
+                yield from lines
+                
+                files_read += 1
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+                    last_report = now
+                    log(f"  Read {files_read}/{len(json_files)} files")
+
+
+class CopyStream(io.TextIOBase):
+    """Read-only text stream over an iterator of lines, for copy_expert."""
     
-    # Select and order columns
-    columns = [
-        'message_id', 'channel_name', 'message_date', 'message_text',
-        'has_media', 'image_path', 'views', 'forwards',
-        'is_reply', 'reply_to_msg_id', 'scraped_at'
-    ]
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buffer = ""
+        self.line_count = 0
     
-    # Only include columns that exist
-    available_columns = [col for col in columns if col in df.columns]
-    df = df[available_columns]
+    def readable(self) -> bool:
+        return True
     
-    return df
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+            self.line_count += 1
+        
+        if size < 0:
+            chunk, self._buffer = self._buffer, ""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
 
 
-def load_to_postgres(df: pd.DataFrame, engine):
-    """Load DataFrame to PostgreSQL using upsert (ON CONFLICT)."""
-    if df.empty:
-        print("⚠ No data to load")
-        return
+def load_to_postgres(
+    json_files: List[str], engine, log: Callable[[str], None] = print
+) -> Tuple[int, int]:
+    """
+    Stream messages from JSON files to PostgreSQL with COPY.
     
-    table_name = "raw.telegram_messages"
+    Messages already in the table are dropped before they are sent, by
+    checking their (message_id, channel_name, message_date) against the
+    keys loaded so far. The rest are formatted on the fly and COPYed into
+    a temporary staging table, so memory use does not grow with the
+    number of messages.
+    A single INSERT ... SELECT then moves them into raw.telegram_messages,
+    skipping any remaining duplicates (ON CONFLICT).
     
-    # Load in chunks to handle large datasets
-    chunk_size = 1000
-    total_rows = len(df)
-    loaded_rows = 0
+    Returns:
+        Tuple of (messages read, new messages loaded)
+    """
+    table_name = "raw.telegram_messages"
+    columns = ", ".join(MESSAGE_COLUMNS)
+    counts = {"already_loaded": 0}
     
-    print(f"\nLoading {total_rows} messages to {table_name}...")
+    print(f"\nStreaming messages to {table_name}...")
     
-    for i in range(0, total_rows, chunk_size):
-        chunk = df.iloc[i:i + chunk_size]
-        
-        try:
-            # Use pandas to_sql with method='multi' for better performance
-            chunk.to_sql(
-                name='telegram_messages',
-                schema='raw',
-                con=engine,
-                if_exists='append',
-                index=False,
-                method='multi'
-            )
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur:
+            # Keys of the rows already loaded; NULL message_dates never
+            # conflict with each other, so those rows are not keys
+            cur.execute(f"""
+                SELECT message_id, channel_name, message_date FROM {table_name}
+                WHERE message_date IS NOT NULL
+            """)
+            loaded_keys = set(cur)
+            stream = CopyStream(iter_copy_lines(json_files, loaded_keys, counts, log))
+            
+            # The load is re-runnable from the source files, so it does not
+            # need to wait for the commit to be flushed to disk
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+            cur.execute(f"""
+                CREATE TEMP TABLE stg_telegram_messages ON COMMIT DROP AS
+                SELECT {columns} FROM {table_name} WITH NO DATA
+            """)
+            cur.copy_expert(f"COPY stg_telegram_messages ({columns}) FROM STDIN", stream)
             
-            loaded_rows += len(chunk)
-            print(f"  Loaded {loaded_rows}/{total_rows} messages...", end='\r')
+            # The staged rows are all new after the pre-filter; rebuilt by
+            # create_raw_indexes() once the rows are in
+            if stream.line_count > INDEX_REBUILD_FRACTION * len(loaded_keys):
+                cur.execute("DROP INDEX IF EXISTS " + ", ".join(
+                    f"raw.{index_name}" for index_name in RAW_INDEXES
+                ))
             
-        except SQLAlchemyError as e:
-            # Handle duplicate key errors (expected due to UNIQUE constraint)
-            if "duplicate key" in str(e).lower() or "unique constraint" in str(e).lower():
-                # Try individual inserts with ON CONFLICT handling
-                for _, row in chunk.iterrows():
-                    try:
-                        row.to_frame().T.to_sql(
-                            name='telegram_messages',
-                            schema='raw',
-                            con=engine,
-                            if_exists='append',
-                            index=False
-                        )
-                        loaded_rows += 1
-                    except:
-                        pass  # Skip duplicates
-            else:
-                print(f"\n  ⚠ Error loading chunk: {e}")
-                continue
+            # Messages already in the table are skipped (UNIQUE constraint)
+            cur.execute(f"""
+                INSERT INTO {table_name} ({columns})
+                SELECT {columns} FROM stg_telegram_messages
+                ON CONFLICT (message_id, channel_name, message_date) DO NOTHING
+            """)
+            loaded_rows = cur.rowcount
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
     
-    print(f"\n✓ Successfully loaded {loaded_rows} messages to {table_name}")
+    total_rows = stream.line_count + counts["already_loaded"]
+    print(f"✓ Successfully loaded {loaded_rows} new messages to {table_name} "
+          f"({total_rows - loaded_rows} duplicates skipped)")
+    return total_rows, loaded_rows
 
 
 def get_table_stats(engine):
@@ -232,55 +485,72 @@ def get_table_stats(engine):
             print("="*50)
 
 
-def main():
-    """Main function to load raw data to PostgreSQL."""
-    print("="*50)
-    print("Loading Raw Data to PostgreSQL")
-    print("="*50)
+def run(
+    engine=None, data_dir: Path = DATA_DIR, log: Callable[[str], None] = print
+) -> Dict:
+    """
+    Load raw JSON data to PostgreSQL and return a status dict.
     
-    # Get data directory
-    data_dir = Path("data/raw/telegram_messages")
+    Pass an existing engine to reuse its connection pool (e.g. from the
+    Dagster pipeline); otherwise a new one is created. Load progress is
+    reported through log (e.g. context.log.info).
     
+    Raises:
+        FileNotFoundError: If the data directory does not exist
+    """
     if not data_dir.exists():
-        print(f"❌ Data directory not found: {data_dir}")
-        sys.exit(1)
+        raise FileNotFoundError(f"Data directory not found: {data_dir}")
     
-    # Connect to database
-    try:
+    if engine is None:
         engine = get_db_connection()
         print("✓ Connected to PostgreSQL")
-    except Exception as e:
-        print(f"❌ Failed to connect to database: {e}")
-        sys.exit(1)
     
     # Create schema and table
     create_raw_schema(engine)
     create_raw_table(engine)
     
-    # Load JSON files
+    # Find JSON files
     print(f"\nLoading JSON files from {data_dir}...")
-    messages = load_json_files(data_dir)
+    json_files = list(iter_json_files(data_dir))
+    print(f"Found {len(json_files)} JSON files to process")
     
-    if not messages:
+    if not json_files:
         print("⚠ No messages found to load")
-        sys.exit(0)
-    
-    print(f"\n✓ Loaded {len(messages)} total messages from JSON files")
-    
-    # Prepare DataFrame
-    print("\nPreparing data...")
-    df = prepare_dataframe(messages)
+        return {"status": "skipped", "message": "No messages found to load", "rows_loaded": 0}
     
-    if df.empty:
-        print("⚠ No valid data to load")
-        sys.exit(0)
+    # Stream messages to PostgreSQL
+    total_rows, rows_loaded = load_to_postgres(json_files, engine, log)
+    create_raw_indexes(engine)
     
-    # Load to PostgreSQL
-    load_to_postgres(df, engine)
+    if total_rows == 0:
+        print("⚠ No messages found to load")
+        return {"status": "skipped", "message": "No messages found to load", "rows_loaded": 0}
     
     # Get statistics
     get_table_stats(engine)
     
+    return {
+        "status": "success",
+        "message": "Raw data loaded to PostgreSQL successfully",
+        "rows_loaded": rows_loaded,
+    }
+
+
+def main():
+    """Main function to load raw data to PostgreSQL."""
+    print("="*50)
+    print("Loading Raw Data to PostgreSQL")
+    print("="*50)
+    
+    try:
+        run()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except (SQLAlchemyError, psycopg2.Error) as e:
+        print(f"❌ Database error: {e}")
+        sys.exit(1)
+    
     print("\n✓ Data loading complete!")
 
 
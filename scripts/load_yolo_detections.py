@@ -8,35 +8,67 @@ This script:
 3. Handles duplicates and data validation
 """
 
-import os
+import csv
+import io
 import sys
 from pathlib import Path
-from urllib.parse import quote_plus
+from typing import Dict, Iterator, List, Tuple
 
-import pandas as pd
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-# Load environment variables
-load_dotenv()
+# Add parent directory to path for imports when running as script
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-# Database connection
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "medical_warehouse")
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
+from src.db import get_engine as get_db_connection
 
+# Detection results written by src/yolo_detect.py
+CSV_PATH = BASE_DIR / "data" / "raw" / "yolo_detections.csv"
 
-def get_db_connection():
-    """Create and return database connection."""
-    encoded_password = quote_plus(POSTGRES_PASSWORD)
-    connection_string = (
-        f"postgresql://{POSTGRES_USER}:{encoded_password}@"
-        f"{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-    )
-    return create_engine(connection_string)
+# CSV columns loaded into raw.yolo_detections, with their Arrow types. The
+# streaming reader fixes column types on its first block, so every loaded
+# column is read as text instead of being inferred and converted to its
+# type per block (see typed_batches); the other CSV columns (detections
+# 6-20) are not parsed at all
+CSV_COLUMN_TYPES = {
+    'message_id': pa.int64(),
+    'channel_name': pa.string(),
+    'image_path': pa.string(),
+    'image_category': pa.string(),
+    'num_detections': pa.int32(),
+    'max_confidence': pa.float64(),
+    'detected_classes': pa.string(),
+    **{
+        column: column_type
+        for i in range(1, 6)
+        for column, column_type in (
+            (f'detected_class_{i}', pa.string()),
+            (f'confidence_{i}', pa.float64()),
+        )
+    },
+}
+
+# Bytes of CSV parsed per block
+CSV_BLOCK_SIZE = 1 << 20
+
+# Secondary indexes, dropped for a bulk load and rebuilt afterwards
+YOLO_INDEXES = {
+    "idx_yolo_message_id": "message_id",
+    "idx_yolo_channel_name": "channel_name",
+    "idx_yolo_category": "image_category",
+}
+
+# maintenance_work_mem for the post-load index builds
+INDEX_BUILD_MEMORY = "1GB"
+
+# The indexes are dropped only when a load adds more than this fraction of
+# the rows already in the table; smaller loads maintain them in place
+INDEX_REBUILD_FRACTION = 0.2
 
 
 def create_raw_schema(engine):
@@ -48,9 +80,14 @@ def create_raw_schema(engine):
 
 
 def create_yolo_detections_table(engine):
-    """Create raw.yolo_detections table if it doesn't exist."""
+    """
+    Create raw.yolo_detections table if it doesn't exist.
+    
+    Like raw.telegram_messages the table is UNLOGGED, since it can be
+    reloaded from the detections CSV at any time.
+    """
     create_table_sql = """
-    CREATE TABLE IF NOT EXISTS raw.yolo_detections (
+    CREATE UNLOGGED TABLE IF NOT EXISTS raw.yolo_detections (
         id SERIAL PRIMARY KEY,
         message_id BIGINT NOT NULL,
         channel_name VARCHAR(255) NOT NULL,
@@ -73,9 +110,8 @@ def create_yolo_detections_table(engine):
         UNIQUE(message_id, channel_name)
     );
     
-    CREATE INDEX IF NOT EXISTS idx_yolo_message_id ON raw.yolo_detections(message_id);
-    CREATE INDEX IF NOT EXISTS idx_yolo_channel_name ON raw.yolo_detections(channel_name);
-    CREATE INDEX IF NOT EXISTS idx_yolo_category ON raw.yolo_detections(image_category);
+    -- Tables created before the switch to UNLOGGED (no-op otherwise)
+    ALTER TABLE raw.yolo_detections SET UNLOGGED;
     """
     
     with engine.connect() as conn:
@@ -84,97 +120,247 @@ def create_yolo_detections_table(engine):
         print("✓ YOLO detections table created/verified")
 
 
+def create_yolo_detections_indexes(engine):
+    """
+    Create the lookup indexes on raw.yolo_detections after a load.
+    
+    Only large loads drop them, so after other loads nothing is built.
+    CONCURRENTLY cannot run inside a transaction, hence the autocommit
+    connection.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"SET maintenance_work_mem = '{INDEX_BUILD_MEMORY}'"))
+        try:
+            for index_name, column in YOLO_INDEXES.items():
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                    f"ON raw.yolo_detections({column})"
+                ))
+        finally:
+            conn.execute(text("RESET maintenance_work_mem"))
+    print("✓ YOLO detections indexes created/verified")
+
+
+class CsvBatchStream(io.RawIOBase):
+    """
+    Read-only byte stream that renders Arrow record batches as CSV, for
+    copy_expert.
+    
+    Only the batch being copied is held in memory.
+    """
+    
+    def __init__(self, batches: Iterator[pa.RecordBatch], columns: List[str]):
+        self._batches = batches
+        self._columns = columns
+        self._buffer = b""
+        self.row_count = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def _render(self, batch: pa.RecordBatch) -> bytes:
+        # Arrow writes NULLs as unquoted empty fields and quotes every
+        # string, which COPY's CSV format reads back as NULL and as text
+        sink = io.BytesIO()
+        pa_csv.write_csv(
+            pa.Table.from_batches([batch]).select(self._columns),
+            sink,
+            pa_csv.WriteOptions(include_header=False),
+        )
+        return sink.getvalue()
+    
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            batch = next(self._batches, None)
+            if batch is None:
+                break
+            self._buffer += self._render(batch)
+            self.row_count += batch.num_rows
+        
+        if size < 0:
+            chunk, self._buffer = self._buffer, b""
+        else:
+            chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+def open_detections_csv(csv_path: Path) -> Tuple[pa_csv.CSVStreamingReader, List[str]]:
+    """
+    Open the detections CSV for streaming, block by block.
+    
+    Only the CSV_COLUMN_TYPES columns present in the file are parsed, all
+    as text. Returns the reader and those column names.
+    """
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    
+    # Only include columns that exist in the CSV
+    available_columns = [col for col in CSV_COLUMN_TYPES if col in header]
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: pa.string() for col in available_columns},
+            include_columns=available_columns,
+            strings_can_be_null=True,
+        ),
+    )
+    return reader, available_columns
+
+
+def _to_column_type(column: pa.Array, column_type: pa.DataType) -> Tuple[pa.Array, int]:
+    """
+    Convert a text column to column_type, with invalid values as NULL.
+    
+    Returns the converted column and the number of values set to NULL.
+    """
+    if column_type == pa.string():
+        return column, 0
+    try:
+        return column.cast(column_type), 0
+    except pa.ArrowInvalid:
+        pass
+    
+    # Slow path for a block with a malformed value: convert value by value
+    values = []
+    for value in column.to_pylist():
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        if number is not None and pa.types.is_integer(column_type):
+            number = int(number) if number.is_integer() else None
+        elif number is not None and number != number:  # NaN
+            number = None
+        values.append(number)
+    invalid = sum(value is None for value in values) - column.null_count
+    return pa.array(values, type=column_type), invalid
+
+
+def typed_batches(
+    reader: pa_csv.CSVStreamingReader, invalid_counts: Dict[str, int]
+) -> Iterator[pa.RecordBatch]:
+    """
+    Convert each CSV block's columns to their CSV_COLUMN_TYPES types.
+    
+    Values that are not valid numbers become NULL, like pandas'
+    to_numeric(errors='coerce'), so one malformed cell does not fail the
+    whole load. They are counted per column in invalid_counts.
+    """
+    for batch in reader:
+        columns = []
+        for name, column in zip(batch.schema.names, batch.columns):
+            column, invalid = _to_column_type(column, CSV_COLUMN_TYPES[name])
+            if invalid:
+                invalid_counts[name] = invalid_counts.get(name, 0) + invalid
+            columns.append(column)
+        yield pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
 def load_csv_to_postgres(csv_path: Path, engine):
-    """Load CSV file to PostgreSQL."""
+    """
+    Stream the detections CSV to PostgreSQL with COPY.
+    
+    The CSV is parsed block by block with Arrow and each block is COPYed
+    into a temporary staging table as soon as it is read, so memory use
+    does not grow with the size of the file.
+    """
     if not csv_path.exists():
         print(f"❌ CSV file not found: {csv_path}")
         return False
     
     print(f"Reading CSV file: {csv_path}")
     try:
-        df = pd.read_csv(csv_path)
+        reader, available_columns = open_detections_csv(csv_path)
     except Exception as e:
         print(f"❌ Error reading CSV file: {e}")
         return False
     
-    if df.empty:
-        print("⚠ CSV file is empty")
-        return False
-    
-    print(f"Found {len(df)} rows in CSV")
-    
-    # Ensure message_id is integer
-    if 'message_id' in df.columns:
-        df['message_id'] = pd.to_numeric(df['message_id'], errors='coerce').astype('Int64')
-    
-    # Ensure num_detections is integer
-    if 'num_detections' in df.columns:
-        df['num_detections'] = pd.to_numeric(df['num_detections'], errors='coerce').astype('Int64')
-    
-    # Ensure confidence columns are numeric
-    confidence_cols = [col for col in df.columns if col.startswith('confidence_')]
-    for col in confidence_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    # Select columns that match table schema
-    table_columns = [
-        'message_id', 'channel_name', 'image_path', 'image_category',
-        'num_detections', 'max_confidence', 'detected_classes',
-        'detected_class_1', 'confidence_1',
-        'detected_class_2', 'confidence_2',
-        'detected_class_3', 'confidence_3',
-        'detected_class_4', 'confidence_4',
-        'detected_class_5', 'confidence_5',
-    ]
-    
-    # Only include columns that exist in DataFrame
-    available_columns = [col for col in table_columns if col in df.columns]
-    df = df[available_columns]
+    invalid_counts = {}
+    stream = CsvBatchStream(typed_batches(reader, invalid_counts), available_columns)
     
     # Load to PostgreSQL
     table_name = "raw.yolo_detections"
-    chunk_size = 1000
-    total_rows = len(df)
-    loaded_rows = 0
+    key_columns = ['message_id', 'channel_name']
+    columns = ", ".join(available_columns)
+    value_columns = [col for col in available_columns if col not in key_columns]
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+    current_values = ", ".join(f"{table_name}.{col}" for col in value_columns)
+    new_values = ", ".join(f"EXCLUDED.{col}" for col in value_columns)
     
-    print(f"\nLoading {total_rows} detections to {table_name}...")
+    print(f"\nLoading detections to {table_name}...")
     
-    for i in range(0, total_rows, chunk_size):
-        chunk = df.iloc[i:i + chunk_size]
-        
-        try:
-            # Use ON CONFLICT to handle duplicates
-            # First, delete existing rows for these message_id + channel_name combinations
-            with engine.connect() as conn:
-                for _, row in chunk.iterrows():
-                    if pd.notna(row.get('message_id')) and pd.notna(row.get('channel_name')):
-                        conn.execute(text("""
-                            DELETE FROM raw.yolo_detections
-                            WHERE message_id = :msg_id AND channel_name = :channel
-                        """), {
-                            'msg_id': int(row['message_id']),
-                            'channel': str(row['channel_name'])
-                        })
-                conn.commit()
-            
-            # Insert new rows
-            chunk.to_sql(
-                name='yolo_detections',
-                schema='raw',
-                con=engine,
-                if_exists='append',
-                index=False,
-                method='multi'
+    # COPY into a temporary staging table, then upsert everything with one
+    # statement: re-detected images replace their previous results
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cur:
+            # The load is re-runnable from the source files, so it does not
+            # need to wait for the commit to be flushed to disk
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+            # csv_row numbers the rows in file order for the de-duplication
+            # below
+            cur.execute(f"""
+                CREATE TEMP TABLE stg_yolo_detections ON COMMIT DROP AS
+                SELECT {columns} FROM {table_name} WITH NO DATA;
+                ALTER TABLE stg_yolo_detections ADD COLUMN csv_row BIGSERIAL;
+            """)
+            cur.copy_expert(
+                f"COPY stg_yolo_detections ({columns}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                stream,
             )
             
-            loaded_rows += len(chunk)
-            print(f"  Loaded {loaded_rows}/{total_rows} detections...", end='\r')
+            if stream.row_count == 0:
+                print("⚠ CSV file is empty")
+                raw_conn.rollback()
+                return False
+            print(f"Found {stream.row_count} rows in CSV")
+            for column, invalid in invalid_counts.items():
+                print(f"⚠ Loading {invalid} invalid values in {column} as NULL")
+            
+            cur.execute("""
+                SELECT count(*) FROM stg_yolo_detections
+                WHERE message_id IS NULL OR channel_name IS NULL
+            """)
+            skipped_rows = cur.fetchone()[0]
+            if skipped_rows:
+                print(f"⚠ Skipping {skipped_rows} rows without message_id/channel_name")
             
-        except SQLAlchemyError as e:
-            print(f"\n  ⚠ Error loading chunk: {e}")
-            continue
+            # The CSV holds every image processed so far, so only the rows
+            # beyond the table's (estimated) size are new; rebuilt by
+            # create_yolo_detections_indexes() once the rows are in
+            cur.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", (table_name,))
+            table_rows = max(cur.fetchone()[0], 0)
+            if stream.row_count - table_rows > INDEX_REBUILD_FRACTION * table_rows:
+                cur.execute("DROP INDEX IF EXISTS " + ", ".join(
+                    f"raw.{index_name}" for index_name in YOLO_INDEXES
+                ))
+            
+            # The key columns are NOT NULL, and one CSV row per image is kept
+            # (the last one) so the upsert never touches a row twice. Rows
+            # whose detections did not change are left as they are.
+            cur.execute(f"""
+                INSERT INTO {table_name} ({columns})
+                SELECT DISTINCT ON (message_id, channel_name) {columns}
+                FROM stg_yolo_detections
+                WHERE message_id IS NOT NULL AND channel_name IS NOT NULL
+                ORDER BY message_id, channel_name, csv_row DESC
+                ON CONFLICT (message_id, channel_name) DO UPDATE SET
+                    {updates},
+                    loaded_at = CURRENT_TIMESTAMP
+                WHERE ({current_values}) IS DISTINCT FROM ({new_values})
+            """)
+            loaded_rows = cur.rowcount
+        raw_conn.commit()
+    except (psycopg2.Error, pa.ArrowException) as e:
+        raw_conn.rollback()
+        print(f"\n❌ Error loading detections: {e}")
+        return False
+    finally:
+        raw_conn.close()
     
-    print(f"\n✓ Successfully loaded {loaded_rows} detections to {table_name}")
+    print(f"✓ Successfully loaded {loaded_rows} new or changed detections to {table_name}")
     return True
 
 
@@ -211,43 +397,62 @@ def get_table_stats(engine):
             print("="*50)
 
 
-def main():
-    """Main function to load YOLO detections to PostgreSQL."""
-    print("="*50)
-    print("Loading YOLO Detections to PostgreSQL")
-    print("="*50)
+def run(engine=None, csv_path: Path = CSV_PATH) -> Dict:
+    """
+    Load YOLO detections to PostgreSQL and return a status dict.
     
-    # Get CSV file path
-    base_dir = Path(__file__).parent.parent
-    csv_path = base_dir / "data" / "raw" / "yolo_detections.csv"
+    Pass an existing engine to reuse its connection pool (e.g. from the
+    Dagster pipeline); otherwise a new one is created.
     
+    Raises:
+        FileNotFoundError: If the detections CSV does not exist
+        RuntimeError: If the CSV could not be loaded
+    """
     if not csv_path.exists():
-        print(f"❌ CSV file not found: {csv_path}")
-        print("Please run src/yolo_detect.py first to generate the CSV file.")
-        sys.exit(1)
+        raise FileNotFoundError(
+            f"CSV file not found: {csv_path}. "
+            "Please run src/yolo_detect.py first to generate the CSV file."
+        )
     
-    # Connect to database
-    try:
+    if engine is None:
         engine = get_db_connection()
         print("✓ Connected to PostgreSQL")
-    except Exception as e:
-        print(f"❌ Failed to connect to database: {e}")
-        sys.exit(1)
     
     # Create schema and table
     create_raw_schema(engine)
     create_yolo_detections_table(engine)
     
     # Load CSV
-    success = load_csv_to_postgres(csv_path, engine)
+    if not load_csv_to_postgres(csv_path, engine):
+        raise RuntimeError(f"Failed to load YOLO detections from {csv_path}")
+    create_yolo_detections_indexes(engine)
     
-    if success:
-        # Get statistics
-        get_table_stats(engine)
-        print("\n✓ Data loading complete!")
-    else:
+    # Get statistics
+    get_table_stats(engine)
+    
+    return {
+        "status": "success",
+        "message": "YOLO detections loaded to PostgreSQL successfully",
+    }
+
+
+def main():
+    """Main function to load YOLO detections to PostgreSQL."""
+    print("="*50)
+    print("Loading YOLO Detections to PostgreSQL")
+    print("="*50)
+    
+    try:
+        run()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except (RuntimeError, SQLAlchemyError) as e:
+        print(f"❌ {e}")
         print("\n❌ Data loading failed!")
         sys.exit(1)
+    
+    print("\n✓ Data loading complete!")
 
 
 if __name__ == "__main__":
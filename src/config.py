@@ -17,6 +17,9 @@ TELEGRAM_CHANNELS = [
 # Scraping settings
 SCRAPING_LIMIT = None  # Set to None to scrape all messages, or an integer to limit
 SCRAPING_DELAY = 1  # Delay between requests in seconds (to avoid rate limiting)
+SCRAPING_CONCURRENCY = 4  # Channels scraped at the same time
+DOWNLOAD_BATCH_SIZE = 16  # Images downloaded concurrently per channel
+DOWNLOAD_RATE_LIMIT = 20  # Maximum image downloads started per second (all channels)
 
 # Data lake settings
 DATA_LAKE_BASE = "data/raw"
@@ -0,0 +1,53 @@
+"""
+Shared PostgreSQL connection for the loader scripts and the pipeline.
+"""
+
+import os
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+# Load environment variables
+load_dotenv()
+
+# Database connection
+POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
+POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
+POSTGRES_DB = os.getenv("POSTGRES_DB", "medical_warehouse")
+POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
+POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
+
+
+def get_database_url() -> str:
+    """Build the connection string from the environment."""
+    # URL-encode password to handle special characters like @
+    encoded_password = quote_plus(POSTGRES_PASSWORD)
+    return (
+        f"postgresql://{POSTGRES_USER}:{encoded_password}@"
+        f"{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    )
+
+
+@lru_cache(maxsize=None)
+def _engine_for(database_url: str) -> Engine:
+    """Create one engine per connection string."""
+    return create_engine(
+        database_url,
+        pool_size=8,
+        pool_pre_ping=True,
+        # Rewrite executemany() into multi-row VALUES pages
+        executemany_mode="values_plus_batch",
+    )
+
+
+def get_engine() -> Engine:
+    """
+    Return the process-wide engine for the warehouse database.
+
+    Every caller in a process shares the same connection pool instead of
+    building (and warming up) its own.
+    """
+    return _engine_for(get_database_url())
@@ -0,0 +1,20 @@
+"""
+Shared helpers for project-relative file paths.
+"""
+
+import os
+from pathlib import Path
+
+# Project root directory
+BASE_DIR = Path(__file__).parent.parent
+
+# Prefix stripped to make file paths relative to BASE_DIR
+BASE_DIR_STR = str(BASE_DIR).rstrip(os.sep) + os.sep
+
+
+def relative_to_base_dir(path: str) -> str:
+    """Return path relative to BASE_DIR (unchanged if outside it)."""
+    # Plain string slicing; Path.relative_to() builds and compares parts per call
+    if path.startswith(BASE_DIR_STR):
+        return path[len(BASE_DIR_STR):]
+    return path
@@ -6,12 +6,15 @@ Ethiopian medical businesses and stores them in a raw data lake structure.
 """
 
 import asyncio
+import io
 import json
+import logging
 import os
 import sys
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 
 # Add parent directory to path for imports when running as script
 BASE_DIR = Path(__file__).parent.parent
@@ -19,6 +22,7 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 import colorlog
+from aiolimiter import AsyncLimiter
 from dotenv import load_dotenv
 from telethon import TelegramClient
 from telethon.errors import (
@@ -27,10 +31,35 @@ from telethon.errors import (
     UsernameNotOccupiedError,
     SessionPasswordNeededError,
 )
-from telethon.tl.types import Message, MessageMediaPhoto
+from telethon.tl.types import (
+    InputPhotoFileLocation,
+    Message,
+    MessageMediaPhoto,
+    Photo,
+    PhotoSize,
+    PhotoSizeProgressive,
+)
 
 try:
-    from src.config import TELEGRAM_CHANNELS, SCRAPING_LIMIT
+    # orjson encodes several times faster; its errors subclass json.JSONDecodeError
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj) -> bytes:
+        """Encode obj as UTF-8 JSON, like orjson.dumps."""
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+from src.paths import relative_to_base_dir
+
+try:
+    from src.config import (
+        TELEGRAM_CHANNELS,
+        SCRAPING_LIMIT,
+        SCRAPING_CONCURRENCY,
+        DOWNLOAD_BATCH_SIZE,
+        DOWNLOAD_RATE_LIMIT,
+    )
 except ImportError:
     # Fallback if config module is not available
     TELEGRAM_CHANNELS = [
@@ -38,6 +67,9 @@ except ImportError:
         "tikvahpharma",
     ]
     SCRAPING_LIMIT = None
+    SCRAPING_CONCURRENCY = 4
+    DOWNLOAD_BATCH_SIZE = 16
+    DOWNLOAD_RATE_LIMIT = 20
 
 # Load environment variables
 load_dotenv()
@@ -59,14 +91,25 @@ CHANNELS = TELEGRAM_CHANNELS
 # Session file location
 SESSION_FILE = BASE_DIR / "telegram_session.session"
 
+# Largest chunk Telegram serves per request; fewer round-trips per photo
+DOWNLOAD_PART_SIZE_KB = 512
+
+# Shared by all channels so concurrent scrapes stay within one download budget
+DOWNLOAD_LIMITER = AsyncLimiter(DOWNLOAD_RATE_LIMIT, 1)
+
 
-def setup_logging() -> colorlog.StreamHandler:
+def setup_logging() -> logging.Logger:
     """Configure colored logging for the scraper."""
+    # Create logger
+    logger = colorlog.getLogger("telegram_scraper")
+    
+    # Already configured by an earlier run in this process (e.g. Dagster)
+    if logger.handlers:
+        return logger
+    
     # Create logs directory if it doesn't exist
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Create logger
-    logger = colorlog.getLogger("telegram_scraper")
     logger.setLevel(colorlog.DEBUG)
     
     # Console handler with colors
@@ -133,11 +176,79 @@ def extract_message_data(message: Message, channel_name: str) -> Dict:
     return message_data
 
 
+def largest_photo_size(photo: Photo) -> Optional[Tuple[str, int]]:
+    """
+    Find the largest downloadable size of a photo.
+    
+    Args:
+        photo: Telethon Photo object
+        
+    Returns:
+        Tuple of (size type, size in bytes), or None if the photo only has
+        inline thumbnails
+    """
+    largest = None
+    for size in photo.sizes:
+        if isinstance(size, PhotoSize):
+            byte_size = size.size
+        elif isinstance(size, PhotoSizeProgressive):
+            byte_size = max(size.sizes)
+        else:
+            # Stripped/cached thumbnails are embedded, not downloadable
+            continue
+        if largest is None or byte_size > largest[1]:
+            largest = (size.type, byte_size)
+    return largest
+
+
+def find_downloaded_message_ids(channel_image_dir: Path) -> Set[int]:
+    """
+    List the message IDs whose images are already in a channel directory.
+    
+    Args:
+        channel_image_dir: Directory holding the channel's {message_id}.jpg files
+        
+    Returns:
+        Set of message IDs (empty if the directory does not exist yet)
+    """
+    downloaded_ids = set()
+    try:
+        with os.scandir(channel_image_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jpg"):
+                    try:
+                        downloaded_ids.add(int(entry.name[:-4]))
+                    except ValueError:
+                        continue
+    except FileNotFoundError:
+        pass
+    return downloaded_ids
+
+
+def write_file_bytes(path: str, data, dir_fd: Optional[int] = None) -> None:
+    """
+    Write a whole file in as few system calls as possible.
+    
+    A single os.write() normally stores the full buffer; the loop only
+    covers short writes. With dir_fd, path is a name relative to that
+    open directory, so the directory path is not resolved again.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
 async def download_image(
     client: TelegramClient,
     message: Message,
     channel_name: str,
-    logger: colorlog.Logger,
+    logger: logging.Logger,
+    downloaded_ids: Optional[Set[int]] = None,
+    dir_fd: Optional[int] = None,
 ) -> Optional[str]:
     """
     Download image from a message if it contains a photo.
@@ -147,6 +258,10 @@ async def download_image(
         message: Message object containing the image
         channel_name: Name of the channel
         logger: Logger instance
+        downloaded_ids: Message IDs already on disk (see
+            find_downloaded_message_ids); checked instead of the filesystem
+        dir_fd: Open descriptor of the channel image directory (see
+            scrape_channel); the image is written relative to it
         
     Returns:
         Path to downloaded image or None
@@ -155,32 +270,93 @@ async def download_image(
         return None
     
     try:
-        # Create channel-specific image directory
         channel_image_dir = IMAGES_DIR / channel_name
-        channel_image_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Download image
         image_path = channel_image_dir / f"{message.id}.jpg"
+        image_file = str(image_path)
         
         # Skip if already downloaded
-        if image_path.exists():
+        if downloaded_ids is not None:
+            already_downloaded = message.id in downloaded_ids
+        else:
+            already_downloaded = image_path.exists()
+        if already_downloaded:
             logger.debug(f"Image {image_path.name} already exists, skipping download")
-            return str(image_path.relative_to(BASE_DIR))
+            return relative_to_base_dir(image_file)
+        
+        # Create channel-specific image directory (already open as dir_fd)
+        if dir_fd is None:
+            channel_image_dir.mkdir(parents=True, exist_ok=True)
         
-        await client.download_media(message.media, file=str(image_path))
+        # Download into memory and write the file in one go, instead of
+        # one write per downloaded part (and no truncated file on failure)
+        buffer = io.BytesIO()
+        photo = message.media.photo
+        largest = largest_photo_size(photo) if isinstance(photo, Photo) else None
+        async with DOWNLOAD_LIMITER:
+            if largest is None:
+                await client.download_media(message.media, file=buffer)
+            else:
+                # Fetch the full-size photo directly in 512 KB parts
+                thumb_size, file_size = largest
+                await client.download_file(
+                    InputPhotoFileLocation(
+                        id=photo.id,
+                        access_hash=photo.access_hash,
+                        file_reference=photo.file_reference,
+                        thumb_size=thumb_size,
+                    ),
+                    file=buffer,
+                    part_size_kb=DOWNLOAD_PART_SIZE_KB,
+                    file_size=file_size,
+                    dc_id=photo.dc_id,
+                )
+        if dir_fd is None:
+            write_file_bytes(image_file, buffer.getbuffer())
+        else:
+            write_file_bytes(image_path.name, buffer.getbuffer(), dir_fd=dir_fd)
         logger.info(f"Downloaded image: {image_path.name}")
         
-        return str(image_path.relative_to(BASE_DIR))
+        return relative_to_base_dir(image_file)
     
     except Exception as e:
         logger.error(f"Error downloading image for message {message.id}: {str(e)}")
         return None
 
 
+async def download_images(
+    client: TelegramClient,
+    batch: List[Tuple[Message, Dict]],
+    channel_name: str,
+    logger: logging.Logger,
+    downloaded_ids: Optional[Set[int]] = None,
+    dir_fd: Optional[int] = None,
+):
+    """
+    Download the images of a batch of messages concurrently.
+    
+    Args:
+        client: Telethon client instance
+        batch: (message, message_data) pairs; each message_data gets its
+            image_path filled in
+        channel_name: Name of the channel
+        logger: Logger instance
+        downloaded_ids: Message IDs already on disk
+        dir_fd: Open descriptor of the channel image directory
+    """
+    image_paths = await asyncio.gather(
+        *(
+            download_image(client, message, channel_name, logger, downloaded_ids, dir_fd)
+            for message, _ in batch
+        )
+    )
+    for (_, message_data), image_path in zip(batch, image_paths):
+        message_data["image_path"] = image_path
+
+
 async def scrape_channel(
     client: TelegramClient,
     channel_username: str,
-    logger: colorlog.Logger,
+    logger: logging.Logger,
     limit: Optional[int] = SCRAPING_LIMIT,
 ) -> List[Dict]:
     """
@@ -196,6 +372,7 @@ async def scrape_channel(
         List of message dictionaries
     """
     messages_data = []
+    dir_fd = None
     
     try:
         logger.info(f"Starting to scrape channel: {channel_username}")
@@ -205,17 +382,33 @@ async def scrape_channel(
         channel_name = entity.title if hasattr(entity, "title") else channel_username
         logger.info(f"Channel title: {channel_name}")
         
+        # One directory scan instead of a stat() per message on re-runs
+        channel_image_dir = IMAGES_DIR / channel_name
+        downloaded_ids = find_downloaded_message_ids(channel_image_dir)
+        
+        # Keep the image directory open so each download is written
+        # relative to it instead of resolving the full path again
+        channel_image_dir.mkdir(parents=True, exist_ok=True)
+        dir_fd = os.open(channel_image_dir, os.O_RDONLY | os.O_DIRECTORY)
+        
         # Scrape messages
         message_count = 0
+        # Messages whose images are downloaded together in the next batch
+        pending_images = []
         async for message in client.iter_messages(entity, limit=limit):
             try:
                 # Extract message data
                 message_data = extract_message_data(message, channel_name)
                 
-                # Download image if present
+                # Queue image download if present
                 if message_data["has_media"]:
-                    image_path = await download_image(client, message, channel_name, logger)
-                    message_data["image_path"] = image_path
+                    pending_images.append((message, message_data))
+                    if len(pending_images) >= DOWNLOAD_BATCH_SIZE:
+                        await download_images(
+                            client, pending_images, channel_name, logger,
+                            downloaded_ids, dir_fd,
+                        )
+                        pending_images = []
                 
                 messages_data.append(message_data)
                 message_count += 1
@@ -227,6 +420,10 @@ async def scrape_channel(
                 logger.error(f"Error processing message {message.id}: {str(e)}")
                 continue
         
+        await download_images(
+            client, pending_images, channel_name, logger, downloaded_ids, dir_fd
+        )
+        
         logger.info(f"Successfully scraped {len(messages_data)} messages from {channel_name}")
         
     except ChannelPrivateError:
@@ -240,17 +437,66 @@ async def scrape_channel(
         return await scrape_channel(client, channel_username, logger, limit)
     except Exception as e:
         logger.error(f"Error scraping channel {channel_username}: {str(e)}")
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
     
     return messages_data
 
 
+def read_saved_message_ids(partition_file: Path, logger: logging.Logger) -> Set[int]:
+    """
+    Collect the message IDs already saved in a partition file.
+    
+    JSON Lines files are read line by line, so only the IDs are kept in
+    memory. Legacy .json files (written before the switch to JSON Lines)
+    hold a list of messages and are decoded whole.
+    
+    Args:
+        partition_file: Path to the partition's .jsonl or legacy .json file
+        logger: Logger instance
+        
+    Returns:
+        Set of saved message IDs (empty if the file does not exist)
+    """
+    saved_ids = set()
+    if not partition_file.exists():
+        return saved_ids
+    
+    if partition_file.suffix == ".json":
+        try:
+            saved = json_loads(partition_file.read_bytes())
+        except json.JSONDecodeError:
+            logger.warning(f"Could not parse {partition_file}")
+            return saved_ids
+        for msg in saved if isinstance(saved, list) else [saved]:
+            if isinstance(msg, dict) and "message_id" in msg:
+                saved_ids.add(msg["message_id"])
+        return saved_ids
+    
+    with open(partition_file, "rb") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                saved_ids.add(json_loads(line)["message_id"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                logger.warning(f"Could not parse line {line_number} of {partition_file}")
+    
+    return saved_ids
+
+
 def save_messages_to_data_lake(
     messages: List[Dict],
     channel_name: str,
-    logger: colorlog.Logger,
+    logger: logging.Logger,
 ):
     """
-    Save scraped messages to the data lake in partitioned JSON format.
+    Save scraped messages to the data lake in partitioned JSON Lines format.
+    
+    Each date partition holds one .jsonl file per channel with one message
+    per line. New messages are appended, so earlier ones are never re-read
+    or rewritten.
     
     Args:
         messages: List of message dictionaries
@@ -262,13 +508,10 @@ def save_messages_to_data_lake(
         return
     
     # Group messages by date
-    messages_by_date = {}
+    messages_by_date = defaultdict(list)
     for msg in messages:
         if msg["message_date"]:
-            date_str = msg["message_date"][:10]  # Extract YYYY-MM-DD
-            if date_str not in messages_by_date:
-                messages_by_date[date_str] = []
-            messages_by_date[date_str].append(msg)
+            messages_by_date[msg["message_date"][:10]].append(msg)  # YYYY-MM-DD
     
     # Save messages partitioned by date
     for date_str, date_messages in messages_by_date.items():
@@ -277,54 +520,94 @@ def save_messages_to_data_lake(
         
         # Sanitize channel name for filename
         safe_channel_name = channel_name.replace(" ", "_").replace("/", "_")
-        json_file = date_dir / f"{safe_channel_name}.json"
+        jsonl_file = date_dir / f"{safe_channel_name}.jsonl"
         
-        # Load existing data if file exists
-        existing_data = []
-        if json_file.exists():
-            try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    existing_data = json.load(f)
-            except json.JSONDecodeError:
-                logger.warning(f"Could not parse existing JSON file: {json_file}")
-        
-        # Merge with existing data (avoid duplicates)
-        existing_ids = {msg["message_id"] for msg in existing_data}
-        new_messages = [
-            msg for msg in date_messages if msg["message_id"] not in existing_ids
-        ]
+        # Skip messages already saved in this partition, including a
+        # legacy .json file for the same channel and date
+        existing_ids = read_saved_message_ids(jsonl_file, logger)
+        existing_ids |= read_saved_message_ids(jsonl_file.with_suffix(".json"), logger)
+        new_messages = []
+        for msg in date_messages:
+            if msg["message_id"] not in existing_ids:
+                existing_ids.add(msg["message_id"])
+                new_messages.append(msg)
         
         if new_messages:
-            all_messages = existing_data + new_messages
-            with open(json_file, "w", encoding="utf-8") as f:
-                json.dump(all_messages, f, ensure_ascii=False, indent=2)
+            with open(jsonl_file, "ab") as f:
+                for msg in new_messages:
+                    f.write(json_dumps(msg) + b"\n")
             
             logger.info(
-                f"Saved {len(new_messages)} new messages to {json_file} "
-                f"(total: {len(all_messages)})"
+                f"Saved {len(new_messages)} new messages to {jsonl_file} "
+                f"(total: {len(existing_ids)})"
             )
         else:
             logger.debug(f"No new messages to save for {date_str}")
 
 
-async def main():
-    """Main function to orchestrate the scraping process."""
+async def scrape_and_save_channel(
+    client: TelegramClient,
+    channel_username: str,
+    semaphore: asyncio.Semaphore,
+    logger: logging.Logger,
+) -> Optional[str]:
+    """
+    Scrape one channel and save its messages as soon as it finishes.
+    
+    Args:
+        client: Telethon client instance
+        channel_username: Username of the channel (without @)
+        semaphore: Bounds how many channels are scraped at once
+        logger: Logger instance
+        
+    Returns:
+        Channel name if any messages were scraped, otherwise None
+    """
+    async with semaphore:
+        messages = await scrape_channel(client, channel_username, logger)
+    
+    if not messages:
+        logger.warning(f"No messages scraped from {channel_username}")
+        return None
+    
+    # Get channel name from first message
+    channel_name = messages[0]["channel_name"]
+    # Save in a worker thread so the other channels keep scraping meanwhile;
+    # each channel writes its own files
+    await asyncio.to_thread(save_messages_to_data_lake, messages, channel_name, logger)
+    return channel_name
+
+
+async def run_async() -> Dict:
+    """
+    Scrape all configured channels and return a status dict.
+    
+    Raises:
+        RuntimeError: If the Telegram credentials are not configured
+    """
     logger = setup_logging()
     ensure_directories()
     
+    # Telethon decrypts every downloaded part; without cryptg it falls back
+    # to pure-Python AES, which dominates download CPU time
+    try:
+        import cryptg  # noqa: F401
+    except ImportError:
+        logger.warning("cryptg is not installed; media downloads will be slow")
+    
     # Validate environment variables
     if not API_ID or not API_HASH:
-        logger.error(
+        message = (
             "TELEGRAM_API_ID and TELEGRAM_API_HASH must be set in .env file. "
             "Get them from https://my.telegram.org/apps"
         )
-        sys.exit(1)
+        logger.error(message)
+        raise RuntimeError(message)
     
     if not PHONE:
-        logger.error(
-            "TELEGRAM_PHONE must be set in .env file (e.g., +251912345678)"
-        )
-        sys.exit(1)
+        message = "TELEGRAM_PHONE must be set in .env file (e.g., +251912345678)"
+        logger.error(message)
+        raise RuntimeError(message)
     
     logger.info("=" * 60)
     logger.info("Telegram Medical Data Scraper")
@@ -341,22 +624,23 @@ async def main():
         await client.start(phone=PHONE)
         logger.info("Successfully connected to Telegram")
         
-        # Scrape each channel
+        # Scrape channels concurrently; the client multiplexes requests over
+        # one connection, and the semaphore keeps us within flood limits
+        semaphore = asyncio.Semaphore(SCRAPING_CONCURRENCY)
+        results = await asyncio.gather(
+            *(
+                scrape_and_save_channel(client, channel, semaphore, logger)
+                for channel in CHANNELS
+            ),
+            return_exceptions=True,
+        )
+        
         all_scraped_channels = []
-        for channel in CHANNELS:
-            try:
-                messages = await scrape_channel(client, channel, logger)
-                if messages:
-                    # Get channel name from first message
-                    channel_name = messages[0]["channel_name"]
-                    save_messages_to_data_lake(messages, channel_name, logger)
-                    all_scraped_channels.append(channel_name)
-                else:
-                    logger.warning(f"No messages scraped from {channel}")
-            
-            except Exception as e:
-                logger.error(f"Failed to scrape channel {channel}: {str(e)}")
-                continue
+        for channel, result in zip(CHANNELS, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to scrape channel {channel}: {str(result)}")
+            elif result:
+                all_scraped_channels.append(result)
         
         # Summary
         logger.info("=" * 60)
@@ -366,22 +650,42 @@ async def main():
         for channel in all_scraped_channels:
             logger.info(f"  - {channel}")
         logger.info("=" * 60)
+        
+        return {
+            "status": "success",
+            "message": "Telegram data scraped successfully",
+            "channels": all_scraped_channels,
+        }
     
     except SessionPasswordNeededError:
         logger.error(
             "Two-factor authentication is enabled. Please enter your password "
             "when prompted, or disable 2FA for this session."
         )
-        sys.exit(1)
+        raise
     
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
-        sys.exit(1)
+        raise
     
     finally:
         await client.disconnect()
         logger.info("Disconnected from Telegram")
 
 
+def run() -> Dict:
+    """Run the scraper from synchronous code (e.g. a Dagster op)."""
+    return asyncio.run(run_async())
+
+
+async def main():
+    """Main function to orchestrate the scraping process."""
+    try:
+        await run_async()
+    except Exception:
+        # Already logged by run_async
+        sys.exit(1)
+
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -6,11 +6,18 @@ and categorizes them based on detected objects (person, bottle, container, etc.)
 """
 
 import csv
+import logging
+import operator
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import colorlog
+import cv2
+import numpy as np
+from dotenv import load_dotenv
 from ultralytics import YOLO
 
 # Add parent directory to path for imports
@@ -18,11 +25,29 @@ BASE_DIR = Path(__file__).parent.parent
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
+from src.paths import relative_to_base_dir
+
+# Load environment variables
+load_dotenv()
+
 # Configuration
 IMAGES_DIR = BASE_DIR / "data" / "raw" / "images"
 OUTPUT_CSV = BASE_DIR / "data" / "raw" / "yolo_detections.csv"
 MODEL_NAME = "yolov8n.pt"  # YOLOv8 nano model for efficiency
 
+# Optional inference backend: "onnx" or "openvino" (empty runs the PyTorch model)
+YOLO_EXPORT_FORMAT = os.getenv("YOLO_EXPORT_FORMAT", "").strip().lower()
+
+# Exported model and export options per format. The model is exported on
+# first use and reused afterwards.
+EXPORT_FORMATS = {
+    # ONNX Runtime; FP16 when exported on a GPU (ultralytics falls back to
+    # FP32 on CPU)
+    "onnx": ("yolov8n.onnx", {"half": True, "dynamic": True}),
+    # OpenVINO INT8 for CPUs, calibrated on the ultralytics sample dataset
+    "openvino": ("yolov8n_int8_openvino_model", {"int8": True, "dynamic": True}),
+}
+
 # YOLO class IDs (COCO dataset)
 CLASS_PERSON = 0
 CLASS_BOTTLE = 39
@@ -33,14 +58,53 @@ CLASS_APPLE = 47
 
 # Product-related classes (containers, bottles, etc.)
 PRODUCT_CLASSES = {CLASS_BOTTLE, CLASS_CUP, CLASS_BOWL}
+PRODUCT_CLASS_IDS = np.array(sorted(PRODUCT_CLASSES), dtype=np.int32)
 
 # Confidence threshold
 CONFIDENCE_THRESHOLD = 0.25
 
+# Output CSV column order (important columns first)
+PRIORITY_COLUMNS = [
+    'message_id',
+    'channel_name',
+    'image_path',
+    'image_category',
+    'num_detections',
+    'max_confidence',
+    'detected_classes',
+]
+
+# Detection columns (detected_class_1, confidence_1, etc.)
+MAX_DETECTION_COLUMNS = 20  # Support up to 20 detections per image
+DETECTION_COLUMN_PAIRS = [
+    (f'detected_class_{i}', f'confidence_{i}')
+    for i in range(1, MAX_DETECTION_COLUMNS + 1)
+]
+DETECTION_COLUMNS = [column for pair in DETECTION_COLUMN_PAIRS for column in pair]
+
+CSV_COLUMNS = PRIORITY_COLUMNS + DETECTION_COLUMNS
+
+# Detection columns of an image with fewer detections stay empty
+EMPTY_DETECTIONS = dict.fromkeys(DETECTION_COLUMNS, '')
+
+# Pulls a CSV row out of a result dict in one call
+csv_row = operator.itemgetter(*CSV_COLUMNS)
+
+# Images passed to the model per inference call
+INFERENCE_BATCH_SIZE = 32
+
+# Threads decoding the next batch of images while the model runs on the current one
+DECODE_WORKERS = min(4, os.cpu_count() or 1)
 
-def setup_logging() -> colorlog.Logger:
+
+def setup_logging() -> logging.Logger:
     """Configure colored logging."""
     logger = colorlog.getLogger("yolo_detector")
+    
+    # Already configured by an earlier run in this process (e.g. Dagster)
+    if logger.handlers:
+        return logger
+    
     logger.setLevel(colorlog.INFO)
     
     console_handler = colorlog.StreamHandler(sys.stdout)
@@ -61,6 +125,41 @@ def setup_logging() -> colorlog.Logger:
     return logger
 
 
+def load_model(logger: logging.Logger) -> YOLO:
+    """
+    Load the detection model for the configured backend.
+    
+    Uses MODEL_NAME directly unless YOLO_EXPORT_FORMAT is set, in which
+    case the exported model is loaded (exporting it first if missing).
+    
+    Args:
+        logger: Logger instance
+        
+    Returns:
+        YOLO model instance
+        
+    Raises:
+        ValueError: If YOLO_EXPORT_FORMAT is not supported
+    """
+    if not YOLO_EXPORT_FORMAT:
+        logger.info(f"Using model: {MODEL_NAME}")
+        return YOLO(MODEL_NAME)
+    
+    if YOLO_EXPORT_FORMAT not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unsupported YOLO_EXPORT_FORMAT {YOLO_EXPORT_FORMAT!r} "
+            f"(expected one of: {', '.join(EXPORT_FORMATS)})"
+        )
+    
+    exported_model, export_options = EXPORT_FORMATS[YOLO_EXPORT_FORMAT]
+    if not Path(exported_model).exists():
+        logger.info(f"Exporting {MODEL_NAME} to {YOLO_EXPORT_FORMAT} (one-time step)...")
+        exported_model = YOLO(MODEL_NAME).export(format=YOLO_EXPORT_FORMAT, **export_options)
+    
+    logger.info(f"Using model: {exported_model}")
+    return YOLO(exported_model, task="detect")
+
+
 def extract_message_id_from_path(image_path: Path) -> Optional[int]:
     """
     Extract message_id from image filename.
@@ -99,9 +198,16 @@ def extract_channel_name_from_path(image_path: Path) -> Optional[str]:
         return None
 
 
-def classify_image(detections: List[Dict]) -> str:
+# Image category by has_person + 2 * has_product
+IMAGE_CATEGORIES = np.array(["other", "lifestyle", "product_display", "promotional"])
+
+
+def classify_images(
+    class_ids_per_image: List[np.ndarray],
+    confidences_per_image: List[np.ndarray],
+) -> List[str]:
     """
-    Classify image based on detected objects.
+    Classify a batch of images based on detected objects.
     
     Classification scheme:
     - promotional: Contains person + product (bottle/container)
@@ -109,43 +215,101 @@ def classify_image(detections: List[Dict]) -> str:
     - lifestyle: Contains person, no product
     - other: Neither detected
     
+    The detections of all images are concatenated and classified with a
+    few array operations for the whole batch instead of per image.
+    
     Args:
-        detections: List of detection dictionaries with 'class' and 'confidence'
+        class_ids_per_image: Class ID of each detection, per image
+        confidences_per_image: Confidence of each detection, per image
         
     Returns:
-        Image category string
+        Image category string per image
+    """
+    num_images = len(class_ids_per_image)
+    if num_images == 0:
+        return []
+    
+    counts = [len(class_ids) for class_ids in class_ids_per_image]
+    class_ids = np.concatenate(class_ids_per_image)
+    confidences = np.concatenate(confidences_per_image)
+    image_index = np.repeat(np.arange(num_images), counts)
+    
+    # Images with at least one confident person / product detection
+    confident = confidences >= CONFIDENCE_THRESHOLD
+    is_person = confident & (class_ids == CLASS_PERSON)
+    is_product = confident & np.isin(class_ids, PRODUCT_CLASS_IDS)
+    has_person = np.bincount(image_index[is_person], minlength=num_images) > 0
+    has_product = np.bincount(image_index[is_product], minlength=num_images) > 0
+    
+    return IMAGE_CATEGORIES[has_person + 2 * has_product].tolist()
+
+
+def result_arrays(result) -> Tuple[np.ndarray, np.ndarray]:
     """
-    has_person = False
-    has_product = False
+    Get the class IDs and confidences of one YOLO result as arrays.
     
-    for detection in detections:
-        class_id = detection.get('class')
-        confidence = detection.get('confidence', 0)
+    Args:
+        result: ultralytics Results object for a single image
         
-        if confidence < CONFIDENCE_THRESHOLD:
-            continue
-            
-        if class_id == CLASS_PERSON:
-            has_person = True
-        elif class_id in PRODUCT_CLASSES:
-            has_product = True
-    
-    # Classification logic
-    if has_person and has_product:
-        return "promotional"
-    elif has_product and not has_person:
-        return "product_display"
-    elif has_person and not has_product:
-        return "lifestyle"
-    else:
-        return "other"
+    Returns:
+        Tuple of (class_ids, confidences)
+    """
+    if result.boxes is None:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    
+    # Copy the box tensors to the host once instead of syncing on an
+    # .item() call per box
+    boxes = result.boxes
+    return boxes.cls.cpu().numpy().astype(np.int32), boxes.conf.cpu().numpy()
+
+
+def build_detections(
+    class_ids: np.ndarray,
+    confidences: np.ndarray,
+    names: Dict[int, str],
+) -> List[Dict]:
+    """
+    Build the detection dicts of one image.
+    
+    Args:
+        class_ids: Class ID of each detection
+        confidences: Confidence of each detection
+        names: Class names by ID (model.names)
+        
+    Returns:
+        Detections list
+    """
+    return [
+        {
+            'class': class_id,
+            'class_name': names[class_id],
+            'confidence': confidence,
+        }
+        for class_id, confidence in zip(class_ids.tolist(), confidences.tolist())
+    ]
+
+
+def parse_result(result, model: YOLO) -> Tuple[List[Dict], str]:
+    """
+    Convert one YOLO result into detections and an image category.
+    
+    Args:
+        result: ultralytics Results object for a single image
+        model: YOLO model instance (for class names)
+        
+    Returns:
+        Tuple of (detections list, image_category)
+    """
+    class_ids, confidences = result_arrays(result)
+    image_category = classify_images([class_ids], [confidences])[0]
+    return build_detections(class_ids, confidences, model.names), image_category
 
 
 def detect_objects_in_image(
     model: YOLO,
     image_path: Path,
-    logger: colorlog.Logger,
-) -> Tuple[List[Dict], str]:
+    logger: logging.Logger,
+) -> Optional[Tuple[List[Dict], str]]:
     """
     Run YOLO detection on a single image.
     
@@ -155,44 +319,129 @@ def detect_objects_in_image(
         logger: Logger instance
         
     Returns:
-        Tuple of (detections list, image_category)
+        Tuple of (detections list, image_category), or None if the image
+        could not be processed
     """
     try:
         # Run inference
         results = model(str(image_path), conf=CONFIDENCE_THRESHOLD, verbose=False)
         
-        detections = []
         if results and len(results) > 0:
-            result = results[0]
-            
-            # Extract detections
-            if result.boxes is not None:
-                boxes = result.boxes
-                for i in range(len(boxes)):
-                    class_id = int(boxes.cls[i].item())
-                    confidence = float(boxes.conf[i].item())
-                    class_name = model.names[class_id]
-                    
-                    detections.append({
-                        'class': class_id,
-                        'class_name': class_name,
-                        'confidence': confidence,
-                    })
-        
-        # Classify image
-        image_category = classify_image(detections)
-        
-        return detections, image_category
+            return parse_result(results[0], model)
+        return [], "other"
     
     except Exception as e:
         logger.error(f"Error processing image {image_path}: {str(e)}")
-        return [], "other"
+        return None
+
+
+def detect_objects_in_batch(
+    model: YOLO,
+    image_paths: List[Path],
+    images: List[Optional[np.ndarray]],
+    logger: logging.Logger,
+) -> Iterator[Optional[Tuple[List[Dict], str]]]:
+    """
+    Run YOLO detection on one batch of decoded images.
+    
+    Images that could not be decoded are reported as None. If
+    inference fails, the batch is retried one image at a time.
+    
+    Args:
+        model: YOLO model instance
+        image_paths: Paths to the image files
+        images: Decoded BGR image per path (None if unreadable)
+        logger: Logger instance
+        
+    Yields:
+        (detections list, image_category) per image, or None for an image
+        that could not be processed, in input order
+    """
+    readable = [image for image in images if image is not None]
+    try:
+        arrays = [
+            result_arrays(result)
+            for result in model.predict(
+                readable,
+                stream=True,
+                conf=CONFIDENCE_THRESHOLD,
+                batch=INFERENCE_BATCH_SIZE,
+                verbose=False,
+            )
+        ] if readable else []
+    except Exception as e:
+        logger.warning(f"Batch inference failed ({str(e)}), retrying images individually")
+        for image_path in image_paths:
+            yield detect_objects_in_image(model, image_path, logger)
+        return
+    
+    # Classify the whole batch at once
+    categories = classify_images(
+        [class_ids for class_ids, _ in arrays],
+        [confidences for _, confidences in arrays],
+    )
+    
+    names = model.names
+    classified = zip(arrays, categories)
+    for image_path, image in zip(image_paths, images):
+        if image is None:
+            logger.error(f"Error processing image {image_path}: could not read image")
+            yield None
+            continue
+        (class_ids, confidences), image_category = next(classified)
+        yield build_detections(class_ids, confidences, names), image_category
+
+
+def detect_objects(
+    model: YOLO,
+    image_paths: List[Path],
+    logger: logging.Logger,
+) -> Iterator[Optional[Tuple[List[Dict], str]]]:
+    """
+    Run YOLO detection over images, yielding results as they are produced.
+    
+    Images are processed in batches of INFERENCE_BATCH_SIZE. While the
+    model works on one batch, a pool of DECODE_WORKERS threads decodes the
+    next, so JPEG decoding overlaps inference instead of running serially
+    in front of it. Only the batch in flight and the one being decoded are
+    held in memory.
+    
+    Args:
+        model: YOLO model instance
+        image_paths: Paths to the image files
+        logger: Logger instance
+        
+    Yields:
+        (detections list, image_category) per image, or None for an image
+        that could not be processed, in input order
+    """
+    batches = [
+        image_paths[start:start + INFERENCE_BATCH_SIZE]
+        for start in range(0, len(image_paths), INFERENCE_BATCH_SIZE)
+    ]
+    if not batches:
+        return
+    
+    with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+        def decode(batch: List[Path]) -> Iterator[Optional[np.ndarray]]:
+            # cv2 releases the GIL while decoding, so the threads run in parallel
+            return executor.map(cv2.imread, [str(image_path) for image_path in batch])
+        
+        pending = decode(batches[0])
+        for index, batch in enumerate(batches):
+            images = list(pending)
+            if index + 1 < len(batches):
+                pending = decode(batches[index + 1])
+            yield from detect_objects_in_batch(model, batch, images, logger)
 
 
 def find_all_images(images_dir: Path) -> List[Path]:
     """
     Find all image files in the images directory.
     
+    Walks the tree once with os.scandir, matching extensions case-insensitively
+    and taking file types from the directory entries.
+    
     Args:
         images_dir: Base directory containing channel subdirectories
         
@@ -208,9 +457,14 @@ def find_all_images(images_dir: Path) -> List[Path]:
     image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif'}
     
     # Recursively find all image files
-    for ext in image_extensions:
-        image_files.extend(images_dir.rglob(f"*{ext}"))
-        image_files.extend(images_dir.rglob(f"*{ext.upper()}"))
+    stack = [str(images_dir)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in image_extensions:
+                    image_files.append(Path(entry.path))
     
     return sorted(image_files)
 
@@ -218,26 +472,28 @@ def find_all_images(images_dir: Path) -> List[Path]:
 def process_images(
     model: YOLO,
     images: List[Path],
-    logger: colorlog.Logger,
-) -> List[Dict]:
+    logger: logging.Logger,
+) -> Iterator[Dict]:
     """
-    Process all images and collect detection results.
+    Process all images, yielding one detection result per image.
     
     Args:
         model: YOLO model instance
         images: List of image file paths
         logger: Logger instance
         
-    Returns:
-        List of detection result dictionaries
+    Yields:
+        Detection result dictionaries, with a key for every CSV column.
+        Images that could not be processed get no result, so a resumed
+        run tries them again.
     """
-    results = []
     total = len(images)
     
     logger.info(f"Processing {total} images...")
     
-    for idx, image_path in enumerate(images, 1):
-        # Extract metadata
+    # Extract metadata
+    to_process = []
+    for image_path in images:
         message_id = extract_message_id_from_path(image_path)
         channel_name = extract_channel_name_from_path(image_path)
         
@@ -249,8 +505,18 @@ def process_images(
             logger.warning(f"Could not extract channel_name from {image_path}, skipping")
             continue
         
-        # Run detection
-        detections, image_category = detect_objects_in_image(model, image_path, logger)
+        to_process.append((image_path, message_id, channel_name))
+    
+    # Run detection
+    detection_stream = detect_objects(
+        model, [image_path for image_path, _, _ in to_process], logger
+    )
+    
+    processed = 0
+    for (image_path, message_id, channel_name), outcome in zip(to_process, detection_stream):
+        if outcome is None:
+            continue
+        detections, image_category = outcome
         
         # Get highest confidence detection for summary
         max_confidence = max([d['confidence'] for d in detections], default=0.0)
@@ -259,76 +525,138 @@ def process_images(
         result = {
             'message_id': message_id,
             'channel_name': channel_name,
-            'image_path': str(image_path.relative_to(BASE_DIR)),
+            'image_path': relative_to_base_dir(str(image_path)),
             'image_category': image_category,
             'num_detections': len(detections),
             'max_confidence': max_confidence,
             'detected_classes': ', '.join(detected_classes) if detected_classes else '',
+            **EMPTY_DETECTIONS,
         }
         
         # Add individual detections
-        for i, detection in enumerate(detections):
-            result[f'detected_class_{i+1}'] = detection['class_name']
-            result[f'confidence_{i+1}'] = detection['confidence']
+        for (class_column, confidence_column), detection in zip(
+            DETECTION_COLUMN_PAIRS, detections
+        ):
+            result[class_column] = detection['class_name']
+            result[confidence_column] = detection['confidence']
         
-        results.append(result)
+        yield result
         
-        if idx % 50 == 0:
-            logger.info(f"Processed {idx}/{total} images...")
-    
-    return results
+        processed += 1
+        if processed % 50 == 0:
+            logger.info(f"Processed {processed}/{total} images...")
 
 
-def save_results_to_csv(results: List[Dict], output_path: Path, logger: colorlog.Logger):
+def read_processed_images(
+    output_path: Path,
+    logger: logging.Logger,
+) -> Optional[Set[Tuple[str, int]]]:
     """
-    Save detection results to CSV file.
+    Read the images already in a previous output CSV.
     
     Args:
-        results: List of detection result dictionaries
         output_path: Path to output CSV file
         logger: Logger instance
+        
+    Returns:
+        Set of (channel_name, message_id) pairs, or None if there is no
+        CSV that new results can be appended to
     """
-    if not results:
-        logger.warning("No results to save")
-        return
-    
-    # Get all possible column names
-    all_columns = set()
-    for result in results:
-        all_columns.update(result.keys())
-    
-    # Define column order (important columns first)
-    priority_columns = [
-        'message_id',
-        'channel_name',
-        'image_path',
-        'image_category',
-        'num_detections',
-        'max_confidence',
-        'detected_classes',
-    ]
+    if not output_path.exists() or output_path.stat().st_size == 0:
+        return None
     
-    # Add detection columns (detected_class_1, confidence_1, etc.)
-    detection_columns = []
-    for i in range(1, 21):  # Support up to 20 detections per image
-        detection_columns.extend([f'detected_class_{i}', f'confidence_{i}'])
+    # A run that stopped mid-row leaves the file without a final newline
+    with open(output_path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            logger.warning(f"{output_path} ends with an incomplete row, reprocessing all images")
+            return None
+    
+    processed = set()
+    with open(output_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        if next(reader, None) != CSV_COLUMNS:
+            logger.info(f"{output_path} has a different column layout, reprocessing all images")
+            return None
+        
+        channel_index = CSV_COLUMNS.index('channel_name')
+        message_index = CSV_COLUMNS.index('message_id')
+        for row in reader:
+            try:
+                processed.add((row[channel_index], int(row[message_index])))
+            except (IndexError, ValueError):
+                continue
+    
+    return processed
+
+
+def save_results_to_csv(
+    results: Iterable[Dict],
+    output_path: Path,
+    logger: logging.Logger,
+    append: bool = False,
+) -> Dict:
+    """
+    Stream detection results to a CSV file, one row per result.
     
-    # Combine columns
-    columns = priority_columns + [col for col in detection_columns if col in all_columns]
+    Rows are written as they are produced, so results are never held in
+    memory all at once.
     
+    Args:
+        results: Detection result dictionaries from process_images
+        output_path: Path to output CSV file
+        logger: Logger instance
+        append: Add the rows to an existing CSV with the same columns
+            instead of replacing it
+        
+    Returns:
+        Summary dict with the number of images, detections and images per category
+    """
     # Write CSV
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(results)
+    images_processed = 0
+    total_detections = 0
+    categories = {}
+    with open(output_path, 'a' if append else 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not append:
+            writer.writerow(CSV_COLUMNS)
+        for result in results:
+            writer.writerow(csv_row(result))
+            
+            images_processed += 1
+            total_detections += result['num_detections']
+            category = result['image_category']
+            categories[category] = categories.get(category, 0) + 1
     
-    logger.info(f"Saved {len(results)} detection results to {output_path}")
+    if images_processed:
+        logger.info(f"Saved {images_processed} detection results to {output_path}")
+    else:
+        logger.warning("No results to save")
+    
+    return {
+        'images_processed': images_processed,
+        'total_detections': total_detections,
+        'categories': categories,
+    }
 
 
-def main():
-    """Main function to orchestrate YOLO detection."""
+def run(
+    images_dir: Path = IMAGES_DIR,
+    output_csv: Path = OUTPUT_CSV,
+    resume: bool = True,
+) -> Dict:
+    """
+    Run YOLO detection on all downloaded images and return a status dict.
+    
+    With resume, images already in output_csv are skipped and the new
+    results are appended to it.
+    
+    Raises:
+        FileNotFoundError: If the images directory does not exist
+        RuntimeError: If the YOLO model cannot be loaded
+    """
     logger = setup_logging()
     
     logger.info("=" * 60)
@@ -336,57 +664,88 @@ def main():
     logger.info("=" * 60)
     
     # Check images directory
-    if not IMAGES_DIR.exists():
-        logger.error(f"Images directory does not exist: {IMAGES_DIR}")
-        sys.exit(1)
+    if not images_dir.exists():
+        logger.error(f"Images directory does not exist: {images_dir}")
+        raise FileNotFoundError(f"Images directory does not exist: {images_dir}")
     
     # Find all images
-    images = find_all_images(IMAGES_DIR)
+    images = find_all_images(images_dir)
     
     if not images:
-        logger.warning(f"No images found in {IMAGES_DIR}")
-        sys.exit(0)
-    
-    logger.info(f"Found {len(images)} images to process")
-    logger.info(f"Using model: {MODEL_NAME}")
+        logger.warning(f"No images found in {images_dir}")
+        return {"status": "skipped", "message": "No images found", "images_processed": 0}
+    
+    logger.info(f"Found {len(images)} images")
+    
+    # Skip images already in the output CSV
+    processed = read_processed_images(output_csv, logger) if resume else None
+    if processed is not None:
+        images = [
+            image_path for image_path in images
+            if (
+                extract_channel_name_from_path(image_path),
+                extract_message_id_from_path(image_path),
+            ) not in processed
+        ]
+        logger.info(f"{len(processed)} images already in {output_csv}, {len(images)} new")
+        
+        if not images:
+            return {
+                "status": "success",
+                "message": "No new images to process",
+                "images_processed": 0,
+            }
     
     # Load YOLO model
     try:
         logger.info("Loading YOLO model...")
-        model = YOLO(MODEL_NAME)
+        model = load_model(logger)
         logger.info("Model loaded successfully")
     except Exception as e:
         logger.error(f"Failed to load YOLO model: {str(e)}")
-        sys.exit(1)
-    
-    # Process images
-    results = process_images(model, images, logger)
-    
-    # Save results
-    save_results_to_csv(results, OUTPUT_CSV, logger)
+        raise RuntimeError(f"Failed to load YOLO model: {e}") from e
+    
+    # Process images, saving each result as it is produced
+    summary = save_results_to_csv(
+        process_images(model, images, logger),
+        output_csv,
+        logger,
+        append=processed is not None,
+    )
+    images_processed = summary['images_processed']
     
     # Summary statistics
     logger.info("=" * 60)
     logger.info("Detection Summary")
     logger.info("=" * 60)
     
-    if results:
-        categories = {}
-        for result in results:
-            category = result['image_category']
-            categories[category] = categories.get(category, 0) + 1
-        
+    if images_processed:
         logger.info("Image categories:")
-        for category, count in sorted(categories.items()):
+        for category, count in sorted(summary['categories'].items()):
             logger.info(f"  {category}: {count}")
         
-        total_detections = sum(r['num_detections'] for r in results)
-        avg_detections = total_detections / len(results) if results else 0
+        total_detections = summary['total_detections']
+        avg_detections = total_detections / images_processed
         logger.info(f"\nTotal detections: {total_detections}")
         logger.info(f"Average detections per image: {avg_detections:.2f}")
     
     logger.info("=" * 60)
     logger.info("Detection complete!")
+    
+    return {
+        "status": "success",
+        "message": "YOLO detection completed successfully",
+        "images_processed": images_processed,
+    }
+
+
+def main():
+    """Main function to orchestrate YOLO detection."""
+    try:
+        run()
+    except (FileNotFoundError, RuntimeError):
+        # Already logged by run
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+"""
+Unit tests for the raw data loader.
+"""
+
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from scripts.load_raw_to_postgres import (
+    MESSAGE_COLUMNS,
+    _to_timestamp,
+    format_copy_line,
+    read_json_file,
+)
+
+
+class TestLoadRawToPostgres:
+    """Test cases for converting data lake values to COPY input."""
+
+    @pytest.mark.parametrize("value", [
+        "2026-01-15T10:00:00+00:00",
+        "2026-01-15T10:00:00.123456+00:00",
+        "2026-01-15T10:00:00Z",
+        "2026-01-15T10:00:00.123Z",
+        "2026-01-15T10:00:00.123456Z",
+        "2026-01-15 10:00:00",
+        "2026-01-15T13:00:00+03:00",
+        "2026-01-15T05:30:00-04:30",
+        "2026-01-15",
+        "2026-01-15T10:00:00.5+00:00",
+        "2026-01-15T10:00:00.5Z",
+        "2026-01-15T10:00:00.1234Z",
+        "2026-01-15T10:00:00+0000",
+        "2026-01-15T13:00:00.25+0300",
+        "2026-01-15T13:00:00+03",
+        "2026-01-15 10:00:00.5",
+    ])
+    def test_to_timestamp_matches_pandas(self, value):
+        """Test timestamp conversion against the pandas conversion it replaced."""
+        expected = pd.to_datetime(value, utc=True).tz_localize(None)
+
+        result = _to_timestamp(value)
+
+        assert result is not None
+        assert pd.Timestamp(result).tz_localize(None) == expected
+
+    @pytest.mark.parametrize("value", [None, "", "not a date", 1705312800])
+    def test_to_timestamp_invalid(self, value):
+        """Test that values pandas would coerce to NaT become NULL."""
+        assert _to_timestamp(value) is None
+
+    def test_format_copy_line(self):
+        """Test COPY text format escaping of special characters."""
+        msg = {
+            "message_id": 1,
+            "channel_name": "test_channel",
+            "message_date": "2026-01-15T10:00:00+00:00",
+            "message_text": "tab\there\nnew line\r\nback\\slash\x00nul",
+            "has_media": False,
+            "image_path": None,
+            "views": 100,
+            "forwards": 5,
+            "is_reply": False,
+            "reply_to_msg_id": None,
+            "scraped_at": "2026-01-15T11:00:00+00:00",
+        }
+
+        line = format_copy_line(msg)
+
+        assert line.endswith("\n")
+        fields = line[:-1].split("\t")
+        assert len(fields) == len(MESSAGE_COLUMNS)
+        assert fields[0] == "1"
+        assert fields[3] == "tab\\there\\nnew line\\r\\nback\\\\slashnul"
+        assert fields[4] == "False"
+        assert fields[5] == "\\N"
+        assert fields[9] == "\\N"
+
+    def test_format_copy_line_missing_values(self):
+        """Test that missing and invalid values are written as NULL."""
+        line = format_copy_line({"message_id": "not a number", "message_text": "\\N"})
+
+        fields = line[:-1].split("\t")
+        assert fields[0] == "\\N"
+        # A literal backslash-N in the text is escaped, not read as NULL
+        assert fields[3] == "\\\\N"
+        assert all(field == "\\N" for i, field in enumerate(fields) if i != 3)
+
+    def test_read_json_file_skips_loaded_keys(self, tmp_path):
+        """Test that only messages matching all unique key columns are skipped."""
+        json_file = tmp_path / "test_channel.jsonl"
+        messages = [
+            {"message_id": 1, "channel_name": "test_channel", "message_date": "2026-01-15T10:00:00Z"},
+            # Same id and channel as a loaded row, different date
+            {"message_id": 1, "channel_name": "test_channel", "message_date": "2026-01-16T10:00:00Z"},
+            {"message_id": 2, "channel_name": "test_channel", "message_date": "2026-01-15T13:00:00+03:00"},
+            {"message_id": 3, "channel_name": "test_channel", "message_date": None},
+        ]
+        json_file.write_text("".join(json.dumps(msg) + "\n" for msg in messages))
+        loaded_keys = {
+            (1, "test_channel", datetime(2026, 1, 15, 10, 0)),
+            (2, "test_channel", datetime(2026, 1, 15, 10, 0)),
+        }
+
+        lines, already_loaded = read_json_file(str(json_file), loaded_keys)
+
+        assert already_loaded == 2
+        assert [line.split("\t")[:3] for line in lines] == [
+            ["1", "test_channel", "2026-01-16T10:00:00+00:00"],
+            ["3", "test_channel", "\\N"],
+        ]
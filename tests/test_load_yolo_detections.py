@@ -0,0 +1,88 @@
+"""
+Unit tests for the YOLO detections loader.
+"""
+
+import csv
+from unittest.mock import patch
+
+import pyarrow as pa
+
+from scripts.load_yolo_detections import open_detections_csv, typed_batches
+
+
+class TestLoadYoloDetections:
+    """Test cases for reading the detections CSV."""
+
+    def test_open_detections_csv_with_late_detections(self, tmp_path):
+        """Test that detection columns empty in the first block still load."""
+        columns = [
+            "message_id",
+            "channel_name",
+            "image_path",
+            "image_category",
+            "num_detections",
+            "max_confidence",
+            "detected_classes",
+        ]
+        for i in range(1, 21):
+            columns.extend([f"detected_class_{i}", f"confidence_{i}"])
+
+        csv_path = tmp_path / "yolo_detections.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for message_id in range(1, 201):
+                writer.writerow({
+                    "message_id": message_id,
+                    "channel_name": "test_channel",
+                    "image_path": f"data/raw/images/test_channel/{message_id}.jpg",
+                    "image_category": "other",
+                    "num_detections": 0,
+                    "max_confidence": 0.0,
+                    "detected_classes": "",
+                })
+            # Last image has more detections than the first block ever saw
+            late_row = {
+                "message_id": 201,
+                "channel_name": "test_channel",
+                "image_path": "data/raw/images/test_channel/201.jpg",
+                "image_category": "product_display",
+                "num_detections": 7,
+                "max_confidence": 0.9,
+                "detected_classes": ", ".join(["bottle"] * 7),
+            }
+            for i in range(1, 8):
+                late_row[f"detected_class_{i}"] = "bottle"
+                late_row[f"confidence_{i}"] = 0.5
+            writer.writerow(late_row)
+
+        with patch("scripts.load_yolo_detections.CSV_BLOCK_SIZE", 4096):
+            reader, loaded_columns = open_detections_csv(csv_path)
+            table = pa.Table.from_batches(list(typed_batches(reader, {})))
+
+        assert "confidence_5" in loaded_columns
+        assert "confidence_6" not in loaded_columns
+        assert table.num_rows == 201
+        assert table.column("confidence_5")[-1].as_py() == 0.5
+        assert table.column("detected_class_5")[-1].as_py() == "bottle"
+        assert table.column("confidence_5")[0].as_py() is None
+
+    def test_typed_batches_invalid_values_become_null(self, tmp_path):
+        """Test that malformed numbers load as NULL instead of failing the load."""
+        csv_path = tmp_path / "yolo_detections.csv"
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["message_id", "channel_name", "num_detections", "confidence_1"])
+            writer.writerow([1, "test_channel", 2, 0.5])
+            writer.writerow([2, "test_channel", "two", "high"])
+            writer.writerow(["x", "test_channel", "3.0", " 0.25 "])
+
+        reader, _ = open_detections_csv(csv_path)
+        invalid_counts = {}
+        table = pa.Table.from_batches(list(typed_batches(reader, invalid_counts)))
+
+        assert table.column("message_id").to_pylist() == [1, 2, None]
+        assert table.column("num_detections").to_pylist() == [2, None, 3]
+        assert table.column("confidence_1").to_pylist() == [0.5, None, 0.25]
+        assert table.schema.field("confidence_1").type == pa.float64()
+        assert invalid_counts == {"message_id": 1, "num_detections": 1, "confidence_1": 1}
@@ -71,16 +71,48 @@ class TestScraper:
                 save_messages_to_data_lake(messages, "test_channel", logger)
 
                 # Check if file was created
-                json_file = tmp_path / "data" / "raw" / "telegram_messages" / "2026-01-15" / "test_channel.json"
+                json_file = tmp_path / "data" / "raw" / "telegram_messages" / "2026-01-15" / "test_channel.jsonl"
                 assert json_file.exists()
 
                 # Verify content
                 with open(json_file, "r") as f:
-                    saved_data = json.load(f)
+                    saved_data = [json.loads(line) for line in f]
                     assert len(saved_data) == 2
                     assert saved_data[0]["message_id"] == 1
                     assert saved_data[1]["message_id"] == 2
 
+                # Saving again appends only the new message
+                messages.append({**messages[1], "message_id": 3})
+                save_messages_to_data_lake(messages, "test_channel", logger)
+
+                with open(json_file, "r") as f:
+                    saved_ids = [json.loads(line)["message_id"] for line in f]
+                    assert saved_ids == [1, 2, 3]
+
+    def test_save_messages_skips_legacy_json_partition(self, tmp_path):
+        """Test that messages in a legacy .json partition are not saved again."""
+        messages_dir = tmp_path / "data" / "raw" / "telegram_messages"
+        with patch("src.scraper.MESSAGES_DIR", messages_dir):
+            date_dir = messages_dir / "2026-01-15"
+            date_dir.mkdir(parents=True)
+            legacy = [{
+                "message_id": 1,
+                "channel_name": "test_channel",
+                "message_date": "2026-01-15T10:00:00",
+                "message_text": "Test message 1",
+            }]
+            (date_dir / "test_channel.json").write_text(json.dumps(legacy))
+
+            messages = [
+                *legacy,
+                {**legacy[0], "message_id": 2, "message_text": "Test message 2"},
+            ]
+            save_messages_to_data_lake(messages, "test_channel", MagicMock())
+
+            with open(date_dir / "test_channel.jsonl", "r") as f:
+                saved_ids = [json.loads(line)["message_id"] for line in f]
+                assert saved_ids == [2]
+
     def test_ensure_directories(self, tmp_path):
         """Test directory creation."""
         with patch("src.scraper.BASE_DIR", tmp_path):